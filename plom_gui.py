@@ -7,12 +7,20 @@ from tkinter import Menu, messagebox, filedialog
 from tkinter import ttk
 import re
 import numpy as np
-import pandas as pd
 from datetime import datetime
 import os
-from plom import parse_input, initialize, run, save_dict, load_dict, save_summary
+from plom_pipeline import (
+    EXCEL_EXTENSIONS, COLUMNAR_EXTENSIONS, HDF5_EXTENSIONS, DATA_CACHE_DIR, PRECISION_DTYPES, 
+    AUDIT_MODES, sniff_data_file, cast_float_arrays, write_session, create_job, run_job, 
+    start_job_process, available_cores, allot_job_cores, thread_env, jobs_to_start, SWEEP_FIELDS, 
+    SWEEP_DESIGNS, parse_sweep_spec, expand_sweep, create_sweep, sweep_results, SHARED_DATA_DIR, STAGE_CACHE_DIR, 
+    shared_segment_dir, shared_training_path, release_training_segment, terminate_job_process, 
+    mark_job_stopped, job_timeout_seconds, job_stages, QueueWriter, route_thread_output, unroute_thread_output, 
+    MEMORY_GUARDS, estimate_job, format_estimate, DMAPS_KERNELS, load_result_dict)
 import sys
 import threading
+import queue
+import time
 from scipy.stats import gaussian_kde
 
 HOME_DIR = os.path.expanduser("~")
@@ -31,6 +39,7 @@ def launch_gui():
     
     tab_switch__plomSampling = True
     tab_switch__plomResults = True
+    tab_switch__jobQueue = True
     tab_switch__diagnostics = False
     tab_switch__featureRanking = False
     tab_switch__conditioning = False
@@ -78,6 +87,7 @@ def launch_gui():
                 print("Saving current session...")
         
         # Close the application
+        release_training_segments(closing=True)
         sys.stdout = original_stdout
         plt.close('all')
         root.destroy()
@@ -190,6 +200,11 @@ def launch_gui():
         inputs['dmaps_L']                = opt_save__plom_dmaps_L.get()
         inputs['dmaps_firstEigvec']      = opt_save__plom_dmaps_firstEigvec.get()
         inputs['dmaps_dim']              = opt_save__plom_dmaps_dim.get()
+        inputs['dmaps_kernel']           = opt_save__plom_dmaps_kernel.get()
+        inputs['dmaps_neighbors']        = opt_save__plom_dmaps_neighbors.get()
+        inputs['dmaps_blockMB']          = opt_save__plom_dmaps_blockMB.get()
+        inputs['dmaps_blockPrecision']   = opt_save__plom_dmaps_blockPrecision.get()
+        inputs['dmaps_blockScratch']     = opt_save__plom_dmaps_blockScratch.get()
         
         inputs['projection_yesNo']       = opt_save__plom_projection_yesNo.get()
         inputs['projection_source']      = opt_save__plom_projection_source.get()
@@ -204,6 +219,7 @@ def launch_gui():
         inputs['sampling_kdeBW']         = opt_save__plom_sampling_kdeBW.get()
         inputs['sampling_saveSamples']   = opt_save__plom_sampling_saveSamples.get()
         inputs['sampling_samplesFType']  = opt_save__plom_sampling_samplesFType.get()
+        inputs['sampling_toFile']        = opt_save__plom_sampling_toFile.get()
         inputs['sampling_parallel']      = opt_save__plom_sampling_parallel.get()
         inputs['sampling_njobs']         = opt_save__plom_sampling_njobs.get()
         
@@ -212,6 +228,21 @@ def launch_gui():
         
         inputs['job_name']               = opt_save__plom_job_name.get()
         inputs['job_path']               = opt_save__plom_job_path.get()
+        inputs['job_dataFormat']         = opt_save__plom_job_dataFormat.get()
+        inputs['job_saveText']           = opt_save__plom_job_saveText.get()
+        inputs['job_dataCacheGB']        = opt_save__plom_job_dataCacheGB.get()
+        inputs['job_precision']          = opt_save__plom_job_precision.get()
+        inputs['job_audit']              = opt_save__plom_job_audit.get()
+        inputs['job_backend']            = opt_save__plom_job_backend.get()
+        inputs['job_shareData']          = opt_save__plom_job_shareData.get()
+        inputs['job_stageCache']         = opt_save__plom_job_stageCache.get()
+        inputs['job_timeoutMin']         = opt_save__plom_job_timeoutMin.get()
+        inputs['job_memoryGuard']        = opt_save__plom_job_memoryGuard.get()
+        
+        inputs['sweep_design']           = opt_save__plom_sweep_design.get()
+        inputs['sweep_nPoints']          = opt_save__plom_sweep_nPoints.get()
+        for field, var in opt_save__plom_sweep_values.items():
+            inputs[f'sweep_{field}'] = var.get()
         
         return inputs
     
@@ -227,11 +258,8 @@ def launch_gui():
             )
         
         if file_path:
-            with open(file_path, 'w') as f:
-                for key, value in plom_gui_input.items():
-                    # f.write(f"{key}\t\t{value}\n")
-                    f.write(f"{key.ljust(25)}: {value}\n")
-                print(f"Session saved to {file_path}\n")
+            write_session(file_path, plom_gui_input)
+            print(f"Session saved to {file_path}\n")
     
     
     def load_session(file_path=None):
@@ -274,6 +302,11 @@ def launch_gui():
                     opt_save__plom_dmaps_L.set(inputs['dmaps_L'])
                     opt_save__plom_dmaps_firstEigvec.set(inputs['dmaps_firstEigvec'])
                     opt_save__plom_dmaps_dim.set(inputs['dmaps_dim'])
+                    opt_save__plom_dmaps_kernel.set(inputs.get('dmaps_kernel', DMAPS_KERNELS[0]))
+                    opt_save__plom_dmaps_neighbors.set(inputs.get('dmaps_neighbors', '32'))
+                    opt_save__plom_dmaps_blockMB.set(inputs.get('dmaps_blockMB', '512'))
+                    opt_save__plom_dmaps_blockPrecision.set(inputs.get('dmaps_blockPrecision', 'float64'))
+                    opt_save__plom_dmaps_blockScratch.set(inputs.get('dmaps_blockScratch', 'No'))
                     
                     opt_save__plom_projection_yesNo.set(inputs['projection_yesNo'])
                     opt_save__plom_projection_source.set(inputs['projection_source'])
@@ -288,6 +321,7 @@ def launch_gui():
                     opt_save__plom_sampling_kdeBW.set(inputs['sampling_kdeBW'])
                     opt_save__plom_sampling_saveSamples.set(inputs['sampling_saveSamples'])
                     opt_save__plom_sampling_samplesFType.set(inputs['sampling_samplesFType'])
+                    opt_save__plom_sampling_toFile.set(inputs.get('sampling_toFile', 'No'))
                     opt_save__plom_sampling_parallel.set(inputs['sampling_parallel'])
                     opt_save__plom_sampling_njobs.set(inputs['sampling_njobs'])
                     
@@ -296,319 +330,445 @@ def launch_gui():
                     
                     opt_save__plom_job_name.set(inputs['job_name'])
                     opt_save__plom_job_path.set(inputs['job_path'])
+                    opt_save__plom_job_dataFormat.set(inputs.get('job_dataFormat', job_dataFormat_options[0]))
+                    opt_save__plom_job_saveText.set(inputs.get('job_saveText', 'No'))
+                    opt_save__plom_job_dataCacheGB.set(inputs.get('job_dataCacheGB', '2'))
+                    opt_save__plom_job_precision.set(inputs.get('job_precision', 'float64'))
+                    opt_save__plom_job_audit.set(inputs.get('job_audit', AUDIT_MODES[0]))
+                    opt_save__plom_job_backend.set(inputs.get('job_backend', 'Process'))
+                    opt_save__plom_job_shareData.set(inputs.get('job_shareData', 'Yes'))
+                    opt_save__plom_job_stageCache.set(inputs.get('job_stageCache', 'Yes'))
+                    opt_save__plom_job_timeoutMin.set(inputs.get('job_timeoutMin', '0'))
+                    opt_save__plom_job_memoryGuard.set(inputs.get('job_memoryGuard', MEMORY_GUARDS[0]))
+                    
+                    opt_save__plom_sweep_design.set(inputs.get('sweep_design', SWEEP_DESIGNS[0]))
+                    opt_save__plom_sweep_nPoints.set(inputs.get('sweep_nPoints', '10'))
+                    for field, var in opt_save__plom_sweep_values.items():
+                        var.set(inputs.get(f'sweep_{field}', ''))
                     
                 print(f'Session file loaded: "{file_path}"\n')
             except:
                 print('Error loading session file\n')
     
     
-    def load_training_data(
-        path, delimiter=None, sheetName=0, hasLabels=False, rowRange=None, 
-        hasIndices=None, columnRange=None, columnsAre='features', rowIgnore=[],
-        colIgnore=[]):
-        
-        data = None
-        
+    ## job queue: "Run job" submits to the queue, jobs start when they fit in the concurrency and core budgets
+    job_queue = []
+    job_queue_state = {'next_id': 1, 'polling': False, 'last_log_job': None, 'segment_dir': None, 
+                       'segments': set()}
+    
+    def queue_budget(var, default):
         try:
-            file_extension = path.split('.')[-1]
-            
-            if file_extension in ["xls", "xlsx", "xlsm", "xlsb"]:
-                if sheetName == None or sheetName == "":
-                    sheetName = 0
-                rowStart = rowRange.split(":")[0]
-                rowEnd   = rowRange.split(":")[1]
-                skiprows = rowStart - 1
-                nrows = rowEnd - rowStart + 1
-                data = pd.read_excel(path, sheet_name=sheetName, skiprows=skiprows,
-                                     nrows=nrows, usecols=columnRange)
-            
-            elif file_extension == "npy":
-                data = np.load(path)
-            
-            else: # csv, txt, dat, or other
-                if file_extension == "csv":
-                    delimiter = ','
-                if type(delimiter) == str and 'Default' in delimiter:
-                    delimiter = None
-                skip_header = int(hasLabels) # ignore first line
-                data = np.genfromtxt(path, delimiter=delimiter, 
-                                     skip_header=skip_header)
-            
-            if len(colIgnore) > 0:
-                if type(colIgnore) == str:
-                    colIgnore = colIgnore.replace(' ', '').split(',')
-                colIgnore_ints = []
-                for el in colIgnore:
-                    if el.isdigit():
-                        colIgnore_ints.append(int(el))
-                    else:
-                        start, end = el.split(":")
-                        colIgnore_ints += list(range(int(start), int(end)+1))
-                data = np.delete(data, colIgnore_ints, axis=1)
-            
-            if len(rowIgnore) > 0:
-                if type(rowIgnore) == str:
-                    rowIgnore = rowIgnore.replace(' ', '').split(',')
-                rowIgnore_ints = []
-                for el in rowIgnore:
-                    if el.isdigit():
-                        rowIgnore_ints.append(int(el))
-                    else:
-                        start, end = el.split(":")
-                        rowIgnore_ints += list(range(int(start), int(end)+1))
-                data = np.delete(data, rowIgnore_ints, axis=0)
-            
-            if columnsAre.strip() == 'Samples':
-                data = data.T
-            
-            if hasIndices:
-                data = data[:, 1:]
-        
-        except:
-            pass
-        
-        return data
+            return max(1, int(var.get()))
+        except (ValueError, NameError, tk.TclError):
+            return default
     
+    def queue_core_budget():
+        return queue_budget(opt_save__job_queue_cores, available_cores())
     
-    def make_input_deck(plom_gui_input):
-        
-        inputs = plom_gui_input
-        
-        scaling_yesNo = "True" if inputs['scaling_yesNo'].strip() == "Yes" else "False"
-        scaling_method = inputs['scaling_method']
-        
-        pca_yesNo = "True" if inputs['pca_yesNo'].strip() == "Yes" else "False"
-        pca_method = inputs['pca_method']
-        pca_criteria = inputs['pca_criteria']
-        pca_scaleEvecs = "True" if inputs['pca_scaleEvecs'].strip() == "Yes" else "False"
-        
-        dmaps_yesNo = "True" if inputs['dmaps_yesNo'].strip() == "Yes" else "False"
-        dmaps_epsilon = inputs['dmaps_epsilon']
-        dmaps_kappa = inputs['dmaps_kappa']
-        dmaps_L = inputs['dmaps_L']
-        dmaps_firstEigvec = inputs['dmaps_firstEigvec']
-        dmaps_dim = inputs['dmaps_dim']
-        
-        projection_yesNo = "True" if inputs['projection_yesNo'].strip() == "Yes" else "False"
-        projection_source = inputs['projection_source']
-        projection_target = inputs['projection_target']
-        
-        sampling_yesNo = "True" if inputs['sampling_yesNo'].strip() == "Yes" else "False"
-        sampling_NSamples = inputs['sampling_NSamples']
-        sampling_f0 = inputs['sampling_f0']
-        sampling_dr = inputs['sampling_dr']
-        sampling_itoSteps = inputs['sampling_itoSteps']
-        sampling_potMethod = inputs['sampling_potMethod']
-        sampling_kdeBW = inputs['sampling_kdeBW']
-        sampling_saveSamples = "True" if inputs['sampling_saveSamples'].strip() == "Yes" else "False"
-        sampling_samplesFType = inputs['sampling_samplesFType']
-        sampling_parallel = "True" if  inputs['sampling_parallel'].strip() == "Yes" else "False"
-        sampling_njobs = inputs['sampling_njobs']
-        
-        
-        job_name = inputs['job_name']
-        job_path = inputs['job_path']
-
-        
-        if pca_method == "Cumulative Energy":
-            pca_method = "cum_energy"
-            pca_criteriaName = "pca_cum_energy    "
-        elif pca_method == "Eigenvalue Cutoff":
-            pca_method = "eigv_cutoff"
-            pca_criteriaName = "pca_eigv_cutoff "
-        elif pca_method == "PCA Dimension":
-            pca_method = "pca_dim"
-            pca_criteriaName = "pca_dim         "
-        
-        if dmaps_epsilon == "0":
-            dmaps_epsilon = "auto"
-        
-        if projection_source == "PCA space":
-            projection_source = "pca"
-        elif projection_source == "Scaled space":
-            projection_source = "scaling"
-        elif projection_source == "Original space":
-            projection_source = "data"
-        
-        if projection_target == "PCA space":
-            projection_target = "pca"
-        elif projection_target == "DMAPs space":
-            projection_target = "dmaps"
-        
-        if sampling_itoSteps == "0":
-            sampling_itoSteps = "auto"
-        
-        job_path_full = f'{job_path}/{job_name}'
-        os.makedirs(job_path_full, exist_ok=True)
-        os.chdir(job_path_full)
-        
-        lines = [
-         '# this is an input file for PLoM;\n',
-         "# lines starting with '#' or '*' are ignored;\n",
-         "# leading ' ', '\\t', '\\n' are ignored;\n",
-         '# option and value should be separated by whitespace(s) or TAB(s);\n',
-         "# inline comments begin with '#'\n",
-         '#########################################################################\n',
-         '\n',
-         '\n',
-         
-         '*** PATH OF TRAINING (INPUT) DATA ***\n',
-         'training           training.txt\n',
-         '\n',
-         '\n',
-         
-         '*** SCALING PARAMETERS ***\n',
-         f'scaling            {scaling_yesNo}\n',
-         f'scaling_method     {scaling_method}\n',
-         '\n',
-         '\n',
-         
-         '*** PCA PARAMETERS ***\n',
-         f'pca                {pca_yesNo}\n',
-         f'pca_scale_evecs    {pca_scaleEvecs}\n',
-         f'pca_method         {pca_method}\n',
-         f'{pca_criteriaName} {pca_criteria}\n',
-         '\n',
-         '\n',
-         
-         '*** DMAPS PARAMETERS ***\n',
-         f'dmaps              {dmaps_yesNo}\n',
-         f'dmaps_epsilon      {dmaps_epsilon} # <float> or auto\n',
-         f'dmaps_kappa        {dmaps_kappa}\n',
-         f'dmaps_L            {dmaps_L}\n',
-         f'dmaps_first_evec   {dmaps_firstEigvec}\n',
-         f'dmaps_m_override   {dmaps_dim}\n',
-         'dmaps_dist_method  standard\n',
-         '\n',
-         '\n',
-         
-         '*** SAMPLING PARAMETERS ***\n',
-         f'sampling           {sampling_yesNo}\n',
-         f'num_samples        {sampling_NSamples}\n',
-         f'parallel           {sampling_parallel}\n',
-         f'n_jobs             {sampling_njobs}\n',
-         f'save_samples       {sampling_saveSamples}\n',
-         'samples_fname      output/samples # if None, file will be named using job_desc and save time\n',
-         f'samples_fmt        {sampling_samplesFType} # npy or txt\n',
-         '\n',
-         '\n',
-         
-         '*** ITO PARAMETERS ***\n',
-         f'projection         {projection_yesNo}\n',
-         f'projection_source  {projection_source} # pca, scaling, or data\n',
-         f'projection_target  {projection_target} # dmaps or pca\n',
-         f'ito_f0             {sampling_f0}\n',
-         f'ito_dr             {sampling_dr}\n',
-         f'ito_steps          {sampling_itoSteps} # <int> or auto\n',
-         f'ito_pot_method     {sampling_potMethod}\n',
-         f'ito_kde_bw_factor  {sampling_kdeBW}\n',
-        
-         '\n',
-         '\n',
-         '*** JOB PARAMETERS ***\n',
-         f'job_desc           {job_name}\n',
-         'verbose            True\n'
-         ]
-        
-        with open('input.txt', 'w') as f:
-            f.writelines(lines)
-    
-    
-    def create_job():
+    def queue_max_jobs():
+        return queue_budget(opt_save__job_queue_maxJobs, available_cores())
+    
+    def run_job_thread():
         inputs = get_plom_gui_input()
-        
-        job_path = inputs['job_path']
-        job_name = inputs['job_name']
-        
-        job_path_full = f'{job_path}/{job_name}'
-        os.makedirs(job_path_full, exist_ok=True)
-        os.makedirs(f'{job_path_full}/output', exist_ok=True)
-        os.chdir(job_path_full)
-        
-        save_session(f"{job_path_full}/session.txt")
-        
-        path = inputs['data_path']
-        delimiter = inputs['data_delimiter']
-        sheetName = inputs['data_sheetName']
-        hasLabels = inputs['data_hasLabels']
-        rowRange = inputs['data_rowRange']
-        hasIndices = inputs['data_hasIndices']
-        columnRange = inputs['data_columnRange']
-        columnsAre = inputs['data_columnsAre']
-        rowIgnore = inputs['data_rowIgnore']
-        colIgnore = inputs['data_colIgnore']
-        
-        training_data = load_training_data(
-            path, delimiter, sheetName, hasLabels, rowRange, 
-            hasIndices, columnRange, columnsAre, rowIgnore, colIgnore)
-        
-        if training_data is None:
-            print("Failed to load training data. Job not created.")
+        if update_estimate(inputs):
+            submit_job(inputs)
+    
+    def update_estimate(inputs=None):
+        # refresh the estimate panel; False if the memory guard refuses the job
+        inputs = inputs or get_plom_gui_input()
+        estimate = estimate_job(inputs)
+        if estimate is None:
+            estimate_label.config(text="No estimate: training data shape unknown")
+            estimate_warnings.config(text="")
+            return True
+        estimate_label.config(text=format_estimate(estimate))
+        estimate_warnings.config(text='\n'.join(estimate['warnings']))
+        if estimate['over_budget'] and inputs['job_memoryGuard'].strip() == "Refuse":
+            print(f"Job refused by the memory guard (estimated peak memory exceeds the available memory):\n"
+                  f"{format_estimate(estimate)}\n")
+            set_info_msg("Job refused: estimated memory exceeds the available memory", 'red')
+            return False
+        return True
+    
+    def submit_job(inputs, prepared=False):
+        job_path_full = f"{inputs['job_path']}/{inputs['job_name']}"
+        for job in job_queue:
+            if job['status'] in ['queued', 'paused', 'running'] and job['job_path_full'] == job_path_full:
+                print(f'Job "{job_path_full}" is already queued or running\n')
+                set_info_msg(f"Job already queued or running: {inputs['job_name']}", 'red')
+                return None
+        cores, _ = allot_job_cores(inputs, queue_core_budget())
+        shared_training = None
+        if inputs['job_shareData'].strip() == "Yes":
+            if job_queue_state['segment_dir'] is None:
+                job_queue_state['segment_dir'] = shared_segment_dir()
+            shared_training = shared_training_path(inputs, job_queue_state['segment_dir'])
+            if shared_training is not None:
+                job_queue_state['segments'].add(shared_training)
+        job = {
+            'id': job_queue_state['next_id'],
+            'name': inputs['job_name'],
+            'job_path_full': job_path_full,
+            'inputs': inputs,
+            'cores': cores,
+            'in_process': inputs['job_backend'].strip() == "Thread",
+            'prepared': prepared,
+            'shared_training': shared_training,
+            'status': 'queued',
+            'submitted': datetime.now(),
+            'started': None,
+            'finished': None,
+            'process': None,
+            'events': None,
+            'thread': None,
+            'completed': None,
+            'reported': None,
+            'timeout': job_timeout_seconds(inputs),
+            'cancel_event': threading.Event(),
+            'cancel_status': None,
+            'kill_at': None,
+            'progress': {'stages': job_stages(inputs), 'stage': None, 'done': [], 'stage_start': None, 
+                         'samples': None},
+            }
+        job_queue_state['next_id'] += 1
+        job_queue.append(job)
+        if tab_switch__jobQueue:
+            job_queue_tree.insert('', tk.END, iid=str(job['id']), values=job_row(job))
+        print(f"Job queued: {job['name']} ({cores} core(s))\n")
+        schedule_jobs()
+        return job
+    
+    def start_queued_job(job):
+        job['cores'], inputs = allot_job_cores(job['inputs'], queue_core_budget())
+        job['status'] = 'running'
+        job['started'] = datetime.now()
+        if job['in_process']:
+            # a thread job sends its log and progress as events too, so only the Tk thread writes to the GUI
+            job['events'] = queue.Queue()
+            def target():
+                route_thread_output(QueueWriter(job['events']))
+                try:
+                    job['completed'] = run_job(inputs, job['prepared'], job['shared_training'], job['cancel_event'], 
+                                               lambda event: job['events'].put(('progress', event)), job['cores'])
+                finally:
+                    unroute_thread_output()
+            job['thread'] = threading.Thread(target=target)
+            job['thread'].start()
+        else:
+            job['process'], job['events'] = start_job_process(inputs, env=thread_env(job['cores']), 
+                                                              prepared=job['prepared'], 
+                                                              shared_training=job['shared_training'], 
+                                                              core_limit=job['cores'])
+            print(f"Job process started: {job['process'].name} (pid {job['process'].pid}, {job['cores']} core(s))\n")
+        update_job_row(job)
+    
+    def schedule_jobs():
+        budget = queue_core_budget()
+        for job in job_queue:
+            if job['status'] == 'queued':
+                job['cores'], _ = allot_job_cores(job['inputs'], budget)
+        for job in jobs_to_start(job_queue, queue_max_jobs(), budget):
+            start_queued_job(job)
+        update_queue_summary()
+        report_finished_sweeps()
+        release_training_segments()
+        if not job_queue_state['polling'] and any(job['status'] == 'running' for job in job_queue):
+            job_queue_state['polling'] = True
+            root.after(200, poll_job_queue)
+    
+    def poll_job_queue():
+        for job in job_queue:
+            if job['status'] == 'running':
+                elapsed = (datetime.now() - job['started']).total_seconds()
+                if job['timeout'] and elapsed > job['timeout'] and job['cancel_status'] is None:
+                    print(f"Job {job['name']} reached its timeout ({job['timeout'] / 60:g} min)\n")
+                    stop_running_job(job, 'timed out')
+                poll_running_job(job)
+                update_job_row(job)
+        update_progress_display()
+        job_queue_state['polling'] = False
+        schedule_jobs()
+    
+    def poll_running_job(job):
+        # relay log, result and status events of a job to the GUI without blocking the Tk loop
+        if job['thread'] is not None:
+            alive = job['thread'].is_alive()
+            relay_job_events(job)
+            if not alive:
+                finish_job(job, 'completed' if job['completed'] else job['cancel_status'] or 'failed')
             return
-        
-        np.savetxt("training.txt", training_data)
-        print(f"Training data loaded: {training_data.shape[0]} samples, {training_data.shape[1]} features")
-        print(f'Training data saved: "{job_path_full}/training.txt"\n')
-        
-        make_input_deck(inputs)
-        print("Input deck created")
-        print(f'Input deck saved: "{job_path_full}/input.txt"\n')
-        print('Job created successfully\n')
+        process = job['process']
+        alive = process.is_alive() # checked before draining, so events sent before exit are not missed
+        relay_job_events(job)
+        if alive:
+            if job['kill_at'] is not None and time.time() > job['kill_at']:
+                print(f"Job process {process.name} did not stop, killing it\n")
+                terminate_job_process(process, force=True)
+                job['kill_at'] = None
+            return
+        process.join()
+        if job['reported'] == 'completed' or job['cancel_status'] is None:
+            if job['reported'] is None:
+                print(f"\nJob process {process.name} terminated unexpectedly (exit code {process.exitcode}). "
+                      "It may have crashed or been killed by the system (out of memory).\n")
+            finish_job(job, job['reported'] or 'crashed')
+        else:
+            finish_job(job, job['cancel_status'])
+    
+    def relay_job_events(job):
+        # log, result, progress and status events sent by the job (its process, or its thread)
+        while True:
+            try:
+                kind, payload = job['events'].get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'log':
+                if job_queue_state['last_log_job'] != job['id']:
+                    job_queue_state['last_log_job'] = job['id']
+                    print(f"\n[{job['name']}]")
+                print(payload, end='')
+            elif kind == 'result':
+                if payload['result_dict'] and tab_switch__plomResults:
+                    results_entry.delete(0, tk.END)
+                    results_entry.insert(0, payload['result_dict'])
+            elif kind == 'progress':
+                record_progress(job, payload)
+            elif kind == 'status':
+                job['reported'] = payload
     
+    def record_progress(job, event):
+        progress = job['progress']
+        if event['event'] == 'stage_start':
+            progress['stage'] = event['stage']
+            progress['stage_start'] = time.time()
+        elif event['event'] == 'stage_end':
+            progress['done'].append(event['stage'])
+            progress['stage'] = None
+        elif event['event'] == 'samples':
+            progress['samples'] = (event['done'], event['total'])
     
-    def run_job():
-        create_job()
-        
+    def update_progress_display():
+        # progress bar and ETA of the most recently started running job
+        if not tab_switch__plomSampling:
+            return
+        running = [job for job in job_queue if job['status'] == 'running']
+        if not running:
+            return
+        job = max(running, key=lambda job: job['started'])
+        progress = job['progress']
+        stages = progress['stages']
+        n_done = len([stage for stage in progress['done'] if stage in stages])
+        fraction = n_done / len(stages)
+        eta = "ETA: -"
+        stage = progress['stage']
+        if stage == 'sampling' and progress['samples'] is not None:
+            done, total = progress['samples']
+            fraction += done / max(total, 1) / len(stages)
+            if done > 0:
+                elapsed = time.time() - progress['stage_start']
+                eta = f"ETA: {format_seconds(elapsed / done * (total - done))} ({done} / {total} samples)"
+        label = f"{stage} ({n_done + 1}/{len(stages)})" if stage else f"{n_done}/{len(stages)} stages done"
+        progress_label.config(text=f"{job['name']}: {label}    elapsed {format_elapsed(job)}")
+        progress_bar['value'] = 100 * fraction
+        progress_eta.config(text=eta)
+    
+    def clear_progress_display(job):
+        if not tab_switch__plomSampling or any(other['status'] == 'running' for other in job_queue):
+            return
+        progress_label.config(text=f"{job['name']}: {job['status']}    elapsed {format_elapsed(job)}")
+        if job['status'] == 'completed':
+            progress_bar['value'] = 100
+        progress_eta.config(text="")
+    
+    def stop_running_job(job, status):
+        # processes (and their sampling workers) are terminated, then killed if still alive after a grace 
+        # period; thread jobs stop at the next PLoM stage boundary
+        job['cancel_status'] = status
+        if job['thread'] is not None:
+            job['cancel_event'].set()
+            print(f"Job {job['name']}: stopping at the next stage boundary\n")
+        else:
+            terminate_job_process(job['process'])
+            job['kill_at'] = time.time() + 10
+        update_job_row(job)
+    
+    def cancel_current_job():
+        # "Cancel job": the queued or running job of the job path and name currently in the GUI
         inputs = get_plom_gui_input()
-        
-        job_path = inputs['job_path']
-        job_name = inputs['job_name']
-        
-        save_results_dict  = True if inputs['results_dict'].strip() == "Yes" else False
-        save_results_plots = True if inputs['results_plots'].strip() == "Yes" else False
-        
-        job_path_full = f'{job_path}/{job_name}'
-        os.makedirs(job_path_full, exist_ok=True)
-        os.makedirs(f'{job_path_full}/output', exist_ok=True)
-        os.chdir(job_path_full)
-        
-        input_deck_fname = "input.txt"
-        
-        if not os.path.exists(input_deck_fname):
-            set_info_msg('Job input deck not found', 'red')
+        job_path_full = f"{inputs['job_path']}/{inputs['job_name']}"
+        for job in job_queue:
+            if job['job_path_full'] == job_path_full and job['status'] in ['queued', 'paused', 'running']:
+                cancel_job(job)
+                schedule_jobs()
+                return
+        print(f'No queued or running job: "{job_path_full}"\n')
+    
+    def cancel_job(job):
+        if job['status'] in ['queued', 'paused']:
+            job['status'] = 'cancelled'
+            job['finished'] = datetime.now()
+            print(f"Job cancelled: {job['name']}\n")
+        elif job['status'] == 'running' and job['cancel_status'] is None:
+            print(f"Cancelling job: {job['name']}\n")
+            stop_running_job(job, 'cancelled')
+    
+    def finish_job(job, status):
+        if status in ['cancelled', 'timed out']:
+            mark_job_stopped(job['job_path_full'], status)
+            print(f"Job {status}: {job['name']}\n")
+        job['status'] = status
+        job['finished'] = datetime.now()
+        clear_progress_display(job)
+        color = 'green' if status == 'completed' else 'red'
+        set_info_msg(f"Job {status}: {job['name']}", color)
+    
+    def release_training_segments(closing=False):
+        # a shared training segment lives as long as a queued, paused or running job uses it
+        active = {job['shared_training'] for job in job_queue if job['status'] in ['queued', 'paused', 'running']}
+        for segment in list(job_queue_state['segments']):
+            if closing or segment not in active:
+                release_training_segment(segment)
+                job_queue_state['segments'].discard(segment)
+                print(f'Shared training segment released: "{segment}"\n')
+        if closing and job_queue_state['segment_dir'] is not None:
+            try:
+                os.rmdir(job_queue_state['segment_dir'])
+            except OSError:
+                pass
+    
+    ## parameter sweeps: one prepared job per design point, reported once all points have finished
+    sweeps = []
+    sweep_state = {'creating': False}
+    
+    def run_sweep():
+        if sweep_state['creating']:
+            set_info_msg('A sweep is already being created', 'red')
             return
-        
+        inputs = get_plom_gui_input()
         try:
-            args = parse_input(input_deck_fname)
-        except:
-            print('Unable to parse job input deck\n')
+            specs = {field: parse_sweep_spec(var.get()) for field, var in opt_save__plom_sweep_values.items()}
+            specs = {field: spec for field, spec in specs.items() if spec is not None}
+            n_points = int(opt_save__plom_sweep_nPoints.get() or 10)
+            if not specs:
+                print('No sweep values specified\n')
+                set_info_msg('No sweep values specified', 'red')
+                return
+            points = expand_sweep(specs, opt_save__plom_sweep_design.get().strip(), n_points)
+        except ValueError as e:
+            print(f'Invalid sweep specification: {e}\n')
+            set_info_msg('Invalid sweep specification', 'red')
             return
-        
-        print("\n\n*** JOB STARTING ***\n\n")
-        solution_dict = initialize(**args)
-        run(solution_dict)
-        
-        if save_results_dict:
-            dict_path = f'{job_path_full}/output/result.dict'
-            save_dict(solution_dict, dict_path)
-            print(f'\n\nResults dictionary saved: "{dict_path}"\n')
-        
-        if save_results_plots:
-            plots_path = f'{job_path_full}/output/plots.pdf'
-            # make_analysis_plot(solution_dict, plots_path)
-            pass
-        
-        try:
-            os.replace(f'{job_name}_plom_summary.txt', 'output/summary.txt')
-        except:
-            summary_path = f'{job_path_full}/output/summary.txt'
-            save_summary(solution_dict, summary_path)
-        
-        print("\n\n*** JOB COMPLETED SUCCESSFULLY ***\n\n")
+        # creating the sweep parses and audits the training data: done in a thread, its log relayed by 
+        # poll_sweep_creation so that only the Tk thread writes to the GUI
+        events = queue.Queue()
+        def target():
+            route_thread_output(QueueWriter(events))
+            point_inputs = None
+            try:
+                point_inputs = create_sweep(inputs, points)
+            finally:
+                unroute_thread_output()
+                events.put(('created', point_inputs))
+        sweep_state['creating'] = True
+        set_info_msg(f"Creating sweep: {len(points)} design points")
+        threading.Thread(target=target, daemon=True).start()
+        root.after(50, poll_sweep_creation, inputs, points, events)
     
-    def run_job_thread():
-        task_thread = threading.Thread(target=run_job)
-        task_thread.start()
+    def poll_sweep_creation(inputs, points, events):
+        while True:
+            try:
+                kind, payload = events.get_nowait()
+            except queue.Empty:
+                root.after(50, poll_sweep_creation, inputs, points, events)
+                return
+            if kind == 'log':
+                print(payload, end='')
+                continue
+            break
+        sweep_state['creating'] = False
+        if payload is None:
+            set_info_msg('Sweep not created', 'red')
+            return
+        jobs = [submit_job(point, prepared=True) for point in payload]
+        sweeps.append({'root': f"{inputs['job_path']}/{inputs['job_name']}", 'points': points, 
+                       'jobs': jobs, 'reported': False})
+    
+    def report_finished_sweeps():
+        for sweep in sweeps:
+            if sweep['reported']:
+                continue
+            statuses = [job['status'] if job is not None else 'not queued' for job in sweep['jobs']]
+            if any(status in ['queued', 'paused', 'running'] for status in statuses):
+                continue
+            sweep['reported'] = True
+            sweep_results(sweep['root'], sweep['points'], statuses)
+            set_info_msg(f"Sweep finished: {sweep['root']}", 'green')
+    
+    def format_seconds(seconds):
+        seconds = int(seconds)
+        return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    
+    def format_elapsed(job):
+        if job['started'] is None:
+            return ""
+        return format_seconds(((job['finished'] or datetime.now()) - job['started']).total_seconds())
+    
+    def job_row(job):
+        backend = "Thread" if job['in_process'] else "Process"
+        started = job['started'].strftime("%H:%M:%S") if job['started'] else ""
+        return (job['id'], job['name'], job['cores'], backend, job['status'], 
+                job['submitted'].strftime("%H:%M:%S"), started, format_elapsed(job))
+    
+    def update_job_row(job):
+        if tab_switch__jobQueue and job_queue_tree.exists(str(job['id'])):
+            job_queue_tree.item(str(job['id']), values=job_row(job))
+    
+    def update_queue_summary():
+        if not tab_switch__jobQueue:
+            return
+        running = [job for job in job_queue if job['status'] == 'running']
+        waiting = [job for job in job_queue if job['status'] in ['queued', 'paused']]
+        cores = sum(job['cores'] for job in running)
+        job_queue_summary.config(text=f"Running: {len(running)}    Waiting: {len(waiting)}    "
+                                      f"Cores in use: {cores} / {queue_core_budget()}")
+        for job in job_queue:
+            update_job_row(job)
+    
+    def selected_jobs():
+        ids = [int(iid) for iid in job_queue_tree.selection()]
+        return [job for job in job_queue if job['id'] in ids]
+    
+    def move_selected_jobs(step):
+        # reorder waiting jobs; the tree mirrors the order of job_queue
+        jobs = selected_jobs()
+        for job in (jobs if step < 0 else reversed(jobs)):
+            i = job_queue.index(job)
+            j = i + step
+            if job['status'] not in ['queued', 'paused'] or not 0 <= j < len(job_queue):
+                continue
+            job_queue[i], job_queue[j] = job_queue[j], job_queue[i]
+            job_queue_tree.move(str(job['id']), '', j)
+        schedule_jobs()
+    
+    def toggle_pause_selected_jobs():
+        for job in selected_jobs():
+            if job['status'] == 'queued':
+                job['status'] = 'paused'
+            elif job['status'] == 'paused':
+                job['status'] = 'queued'
+        schedule_jobs()
+    
+    def cancel_selected_jobs():
+        for job in selected_jobs():
+            cancel_job(job)
+        schedule_jobs()
+    
+    def clear_finished_jobs():
+        for job in list(job_queue):
+            if job['status'] in ['completed', 'failed', 'crashed', 'cancelled', 'timed out']:
+                job_queue.remove(job)
+                job_queue_tree.delete(str(job['id']))
+        update_queue_summary()
     
     
     class TextRedirector:
@@ -694,6 +854,11 @@ def launch_gui():
         jobResults_tab = tk.Frame(tab_control)
         tab_control.add(jobResults_tab, text="PLoM Results")
     
+    # Create the "Job Queue" tab
+    if tab_switch__jobQueue:
+        jobQueue_tab = tk.Frame(tab_control)
+        tab_control.add(jobQueue_tab, text="Job Queue")
+    
     # Create the "Diagnostics Results" tab
     if tab_switch__diagnostics:
         diagResults_tab = tk.Frame(tab_control)
@@ -748,9 +913,11 @@ def launch_gui():
             if False in plom_settings_run_ready.values():
                 button_createJob["state"] = "disabled"
                 button_runJob["state"] = "disabled"
+                button_runSweep["state"] = "disabled"
             else:
                 button_createJob["state"] = "normal"
                 button_runJob["state"] = "normal"
+                button_runSweep["state"] = "normal"
         
         # Create frames for layout in the "Data augmentation" tab
         plom_settings_frame = tk.Frame(data_augmentation_tab, width=400)
@@ -1121,7 +1288,7 @@ def launch_gui():
         opt_value__plom_data_path = tk.Entry(frame__plom_data, textvariable=opt_save__plom_data_path)
         opt_value__plom_data_path.grid(row=group_row, column=1, sticky='ew')
         name__plom_data_path = "PLoM Training Data Path"
-        info_msg__plom_data_path = "Data path: absolute path\n    Training data file path.\n    Must be a valid file path of a raw data, csv, or Excel file."
+        info_msg__plom_data_path = "Data path: absolute path\n    Training data file path.\n    Must be a valid file path of a raw data, csv, npy, Parquet, Feather, HDF5, or Excel file."
         opt_label__plom_data_path.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_path, info_msg__plom_data_path))
         opt_value__plom_data_path.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_path, info_msg__plom_data_path))
         
@@ -1129,6 +1296,79 @@ def launch_gui():
         opt_button__plom_data_path.grid(row=group_row, column=2, sticky='ew', padx=(5, 0))
         opt_button__plom_data_path.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event))
         
+        group_row += 1
+        opt_save__plom_data_preview = tk.StringVar(frame__plom_data)
+        opt_value__plom_data_preview = tk.Label(frame__plom_data, textvariable=opt_save__plom_data_preview, anchor='w', justify='left', fg='gray', wraplength=380)
+        opt_value__plom_data_preview.grid(row=group_row, column=0, columnspan=3, sticky='w')
+        opt_value__plom_data_preview.grid_remove()
+        name__plom_data_preview = "PLoM Training Data Preview"
+        info_msg__plom_data_preview = "Preview: Shape, delimiter and header detected from the first few KB (or the metadata) of the data file. Rows counts prefixed with ~ are estimates."
+        opt_value__plom_data_preview.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_preview, info_msg__plom_data_preview))
+        
+        ## data file sniffing runs in a worker thread; results are posted to a queue polled from the Tk loop
+        ## each path change bumps the generation, so stale results (and pending sniffs) are dropped
+        sniff_state = {'generation': 0, 'after_id': None, 'result': None}
+        sniff_results = queue.Queue()
+        
+        def sniff_worker(path, generation):
+            if generation != sniff_state['generation']:
+                return # superseded before it started
+            try:
+                result = sniff_data_file(path)
+            except Exception as e:
+                result = {'summary': f'Unable to preview file ({type(e).__name__}: {e})', 'error': True}
+            sniff_results.put((generation, result))
+        
+        def start_data_sniff():
+            sniff_state['after_id'] = None
+            path = opt_save__plom_data_path.get()
+            if not os.path.isfile(path):
+                opt_value__plom_data_preview.grid_remove()
+                return
+            opt_save__plom_data_preview.set('Preview: reading...')
+            opt_value__plom_data_preview.config(fg='gray')
+            opt_value__plom_data_preview.grid()
+            threading.Thread(target=sniff_worker, args=(path, sniff_state['generation']), daemon=True).start()
+            root.after(50, poll_data_sniff, sniff_state['generation'])
+        
+        def poll_data_sniff(generation):
+            if generation != sniff_state['generation']:
+                return # a newer sniff has its own poll loop
+            while True:
+                try:
+                    result_generation, result = sniff_results.get_nowait()
+                except queue.Empty:
+                    root.after(50, poll_data_sniff, generation)
+                    return
+                if result_generation == generation:
+                    sniff_state['result'] = result
+                    show_data_preview()
+                    return
+        
+        def show_data_preview(*args):
+            result = sniff_state['result']
+            if result is None:
+                return
+            text = f"Preview: {result['summary']}"
+            color = 'red' if result.get('error') else 'gray'
+            extension = opt_save__plom_data_path.get().split('.')[-1]
+            if 'delimiter' in result and extension != 'csv' and result['delimiter'] != opt_save__plom_data_delimiter.get():
+                text += "\n    Selected delimiter differs from the detected one"
+                color = 'dark orange'
+            if result.get('hasLabels') and not opt_save__plom_data_hasLabels.get():
+                text += "\n    First line looks like labels: check <Features have labels>"
+                color = 'dark orange'
+            opt_save__plom_data_preview.set(text)
+            opt_value__plom_data_preview.config(fg=color)
+        
+        def request_data_sniff(*args):
+            # debounced: typing a path only sniffs once the entry is idle
+            sniff_state['generation'] += 1
+            sniff_state['result'] = None
+            if sniff_state['after_id'] is not None:
+                root.after_cancel(sniff_state['after_id'])
+            sniff_state['after_id'] = root.after(300, start_data_sniff)
+        
         def validate__plom_data_path(P, d, i, S, V):
             input_str = P
             why = d # action code: 0 for deletion, 1 for insertion, or -1 for focus in, focus out, or a change to the textvariable
@@ -1161,7 +1401,8 @@ def launch_gui():
         
         def plom_data_path_update(*args):
             extension = opt_save__plom_data_path.get().split('.')[-1]
-            if extension in ['xls', 'xlsx', 'xlsm', 'xlsb']:
+            if extension in EXCEL_EXTENSIONS:
+                opt_label__plom_data_sheetName.config(text="Excel sheet name")
                 opt_label__plom_data_sheetName.grid()
                 opt_value__plom_data_sheetName.grid()
                 opt_label__plom_data_delimiter.grid_remove()
@@ -1180,6 +1421,32 @@ def launch_gui():
                 plom_settings_run_ready['data_row_option'] = False
                 plom_settings_run_ready['data_column_option'] = False
                 validate_run_ready(plom_settings_run_ready)
+            
+            elif extension in COLUMNAR_EXTENSIONS:
+                # column names are schema metadata, not a data row; HDF5 reuses the sheet entry for the dataset path
+                if extension in HDF5_EXTENSIONS:
+                    opt_label__plom_data_sheetName.config(text="HDF5 dataset")
+                    opt_label__plom_data_sheetName.grid()
+                    opt_value__plom_data_sheetName.grid()
+                else:
+                    opt_label__plom_data_sheetName.grid_remove()
+                    opt_value__plom_data_sheetName.grid_remove()
+                opt_label__plom_data_delimiter.grid_remove()
+                opt_value__plom_data_delimiter.grid_remove()
+                
+                opt_label__plom_data_rowRange.grid_remove()
+                opt_value__plom_data_rowRange.grid_remove()
+                opt_label__plom_data_hasLabels.grid_remove()
+                opt_value__plom_data_hasLabels.grid_remove()
+                
+                opt_label__plom_data_columnRange.grid_remove()
+                opt_value__plom_data_columnRange.grid_remove()
+                opt_label__plom_data_hasIndices.grid()
+                opt_value__plom_data_hasIndices.grid()
+                
+                plom_settings_run_ready['data_row_option'] = True
+                plom_settings_run_ready['data_column_option'] = True
+                validate_run_ready(plom_settings_run_ready)
                 
             else:
                 opt_label__plom_data_sheetName.grid_remove()
@@ -1202,6 +1469,7 @@ def launch_gui():
                 validate_run_ready(plom_settings_run_ready)
                 
         opt_save__plom_data_path.trace_add("write", plom_data_path_update)  
+        opt_save__plom_data_path.trace_add("write", request_data_sniff)
         
         #---------------------------------------------------------------------------------------------------#
         
@@ -1217,6 +1485,7 @@ def launch_gui():
         info_msg__plom_data_delimiter = "Delimiter: Specifies delimiter if training data is raw data. If (Default), the default behavior of the data loading function is used."
         opt_label__plom_data_delimiter.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_delimiter, info_msg__plom_data_delimiter))
         opt_value__plom_data_delimiter.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_delimiter, info_msg__plom_data_delimiter))
+        opt_save__plom_data_delimiter.trace_add("write", show_data_preview)
         
         ## option if data file is excel
         opt_save__plom_data_sheetName = tk.StringVar()
@@ -1227,7 +1496,7 @@ def launch_gui():
         opt_value__plom_data_sheetName.grid(row=group_row, column=1, sticky='ew')
         opt_value__plom_data_sheetName.grid_remove()
         name__plom_data_sheetName = "PLoM data sheet name"
-        info_msg__plom_data_sheetName = "Excel sheet name: The name of the sheet containing the data to be read. If left blank, the first sheet in the Excel file is read."
+        info_msg__plom_data_sheetName = "Excel sheet name: The name of the sheet containing the data to be read. If left blank, the first sheet in the Excel file is read. For HDF5 files, the path of the 2-D dataset to read (e.g. group/data); if left blank, the first 2-D dataset found is read."
         opt_label__plom_data_sheetName.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_sheetName, info_msg__plom_data_sheetName))
         opt_value__plom_data_sheetName.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_sheetName, info_msg__plom_data_sheetName))
         
@@ -1249,6 +1518,7 @@ def launch_gui():
         info_msg__plom_data_hasLabels = "Features have labels: Option for non-Excel data files. If checked, the first line in the file will be ignored."
         opt_label__plom_data_hasLabels.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_hasLabels, info_msg__plom_data_hasLabels))
         opt_value__plom_data_hasLabels.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_hasLabels, info_msg__plom_data_hasLabels))
+        opt_save__plom_data_hasLabels.trace_add("write", show_data_preview)
         
         ## option if data file is excel
         opt_save__plom_data_rowRange = tk.StringVar(frame__plom_data)
@@ -1313,7 +1583,7 @@ def launch_gui():
         opt_value__plom_data_hasIndices = tk.Checkbutton(frame__plom_data, variable=opt_save__plom_data_hasIndices, onvalue = 1, offvalue = 0, anchor='w')
         opt_value__plom_data_hasIndices.grid(row=group_row, column=1, sticky='ew')
         name__plom_data_hasIndices = "Samples have indices"
-        info_msg__plom_data_hasIndices = "Samples have indices: Option for non-Excel data files. If checked, the first column in the file will be ignored."
+        info_msg__plom_data_hasIndices = "Samples have indices: Option for non-Excel data files. If checked, the first column in the file will be ignored. For Parquet, Feather and HDF5 files, ignored rows and columns are never read from disk."
         opt_label__plom_data_hasIndices.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_hasIndices, info_msg__plom_data_hasIndices))
         opt_value__plom_data_hasIndices.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_data_hasIndices, info_msg__plom_data_hasIndices))
         
@@ -1974,6 +2244,102 @@ def launch_gui():
         
         #---------------------------------------------------------------------------------------------------#
         
+        group_row += 1
+        opt_save__plom_dmaps_kernel = tk.StringVar(frame__plom_dmaps)
+        opt_label__plom_dmaps_kernel = tk.Label(frame__plom_dmaps, text="Kernel", anchor='w')
+        opt_label__plom_dmaps_kernel.grid(row=group_row, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_dmaps_kernel = ttk.Combobox(frame__plom_dmaps, values=DMAPS_KERNELS, state='readonly', textvariable=opt_save__plom_dmaps_kernel)
+        opt_value__plom_dmaps_kernel.current(0)
+        opt_value__plom_dmaps_kernel.grid(row=group_row, column=1, sticky='ew')
+        name__plom_dmaps_kernel = "DMAPs kernel"
+        info_msg__plom_dmaps_kernel = "Kernel:\n    <Dense>: all N x N pairs of training points (PLoM default); memory and time grow as N^2.\n    <Dense (blocked)>: the same kernel computed in tiles on all allotted cores, within <Block memory>; only the leading eigenvectors are computed (eigen-solver). The kernel is kept in memory if it fits half the budget, else in a scratch file in the job's output directory (<Scratch file>), else recomputed at every solver iteration.\n    <Sparse kNN>: each point keeps its <Neighbours> nearest neighbours (KD-tree), with a truncated Gaussian kernel, and only the leading eigenvectors are computed (sparse eigen-solver). Memory grows as N x neighbours, for training sets too large for the dense kernel.\n    Default = Dense"
+        opt_label__plom_dmaps_kernel.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_kernel, info_msg__plom_dmaps_kernel))
+        opt_value__plom_dmaps_kernel.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_kernel, info_msg__plom_dmaps_kernel))
+        
+        #---------------------------------------------------------------------------------------------------#
+        
+        group_row += 1
+        opt_save__plom_dmaps_neighbors = tk.StringVar(frame__plom_dmaps)
+        opt_save__plom_dmaps_neighbors.set('32')
+        opt_label__plom_dmaps_neighbors = tk.Label(frame__plom_dmaps, text="Neighbours", anchor='w')
+        opt_label__plom_dmaps_neighbors.grid(row=group_row, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_dmaps_neighbors = tk.Entry(frame__plom_dmaps, textvariable=opt_save__plom_dmaps_neighbors)
+        opt_value__plom_dmaps_neighbors.grid(row=group_row, column=1, sticky='ew')
+        name__plom_dmaps_neighbors = "DMAPs neighbours"
+        info_msg__plom_dmaps_neighbors = "Neighbours: int > 1\n    Nearest neighbours kept per point by the <Sparse kNN> kernel. Larger values approach the dense kernel at a higher cost; Epsilon should be small enough for the kernel to vanish beyond them.\n    Default = 32"
+        opt_label__plom_dmaps_neighbors.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_neighbors, info_msg__plom_dmaps_neighbors))
+        opt_value__plom_dmaps_neighbors.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_neighbors, info_msg__plom_dmaps_neighbors))
+        
+        def validate__plom_dmaps_neighbors(P, d, i, S, V):
+            ## input must be an integer greater than 1
+            input_ok = P.isdigit() or P == ""
+            pattern_ok = P.isdigit() and int(P) > 1
+            opt_label__plom_dmaps_neighbors['foreground'] = 'black' if pattern_ok else 'red'
+            validate_run_ready(plom_settings_run_ready, 'dmaps_neighbors', pattern_ok)
+            if d == "0":
+                return True
+            return input_ok
+        
+        reg_val__validate__plom_dmaps_neighbors = root.register(validate__plom_dmaps_neighbors)
+        opt_value__plom_dmaps_neighbors.config(validate="key", validatecommand=(reg_val__validate__plom_dmaps_neighbors, '%P', '%d', '%i', '%S', '%V'))
+        
+        #---------------------------------------------------------------------------------------------------#
+        
+        group_row += 1
+        opt_save__plom_dmaps_blockMB = tk.StringVar(frame__plom_dmaps)
+        opt_save__plom_dmaps_blockMB.set('512')
+        opt_label__plom_dmaps_blockMB = tk.Label(frame__plom_dmaps, text="Block memory (MB)", anchor='w')
+        opt_label__plom_dmaps_blockMB.grid(row=group_row, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_dmaps_blockMB = tk.Entry(frame__plom_dmaps, textvariable=opt_save__plom_dmaps_blockMB)
+        opt_value__plom_dmaps_blockMB.grid(row=group_row, column=1, sticky='ew')
+        name__plom_dmaps_blockMB = "DMAPs block memory"
+        info_msg__plom_dmaps_blockMB = "Block memory (MB): float > 0\n    Memory the <Dense (blocked)> kernel may use for its tiles (and the kernel itself, when it fits half of it), shared by the threads. Larger tiles use BLAS more efficiently.\n    Default = 512"
+        opt_label__plom_dmaps_blockMB.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_blockMB, info_msg__plom_dmaps_blockMB))
+        opt_value__plom_dmaps_blockMB.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_blockMB, info_msg__plom_dmaps_blockMB))
+        
+        def validate__plom_dmaps_blockMB(P, d, i, S, V):
+            ## input must be a positive number
+            input_ok = P.replace(".", "", 1).isdigit() or P == ""
+            pattern_ok = P.replace(".", "", 1).isdigit() and float(P) > 0
+            opt_label__plom_dmaps_blockMB['foreground'] = 'black' if pattern_ok else 'red'
+            validate_run_ready(plom_settings_run_ready, 'dmaps_blockMB', pattern_ok)
+            if d == "0":
+                return True
+            return input_ok
+        
+        reg_val__validate__plom_dmaps_blockMB = root.register(validate__plom_dmaps_blockMB)
+        opt_value__plom_dmaps_blockMB.config(validate="key", validatecommand=(reg_val__validate__plom_dmaps_blockMB, '%P', '%d', '%i', '%S', '%V'))
+        
+        #---------------------------------------------------------------------------------------------------#
+        
+        group_row += 1
+        opt_save__plom_dmaps_blockPrecision = tk.StringVar(frame__plom_dmaps)
+        opt_label__plom_dmaps_blockPrecision = tk.Label(frame__plom_dmaps, text="Block precision", anchor='w')
+        opt_label__plom_dmaps_blockPrecision.grid(row=group_row, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_dmaps_blockPrecision = ttk.Combobox(frame__plom_dmaps, values=list(PRECISION_DTYPES), state='readonly', textvariable=opt_save__plom_dmaps_blockPrecision)
+        opt_value__plom_dmaps_blockPrecision.current(0)
+        opt_value__plom_dmaps_blockPrecision.grid(row=group_row, column=1, sticky='ew')
+        name__plom_dmaps_blockPrecision = "DMAPs block precision"
+        info_msg__plom_dmaps_blockPrecision = "Block precision: Precision of the <Dense (blocked)> kernel tiles.\n    <float32> halves their memory and doubles the BLAS throughput; eigenvalues agree with float64 to about 1e-7.\n    Default = float64"
+        opt_label__plom_dmaps_blockPrecision.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_blockPrecision, info_msg__plom_dmaps_blockPrecision))
+        opt_value__plom_dmaps_blockPrecision.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_blockPrecision, info_msg__plom_dmaps_blockPrecision))
+        
+        #---------------------------------------------------------------------------------------------------#
+        
+        group_row += 1
+        opt_save__plom_dmaps_blockScratch = tk.StringVar(frame__plom_dmaps)
+        opt_label__plom_dmaps_blockScratch = tk.Label(frame__plom_dmaps, text="Scratch file", anchor='w')
+        opt_label__plom_dmaps_blockScratch.grid(row=group_row, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_dmaps_blockScratch = ttk.Combobox(frame__plom_dmaps, values=["Yes", "No"], state='readonly', textvariable=opt_save__plom_dmaps_blockScratch)
+        opt_value__plom_dmaps_blockScratch.current(1)
+        opt_value__plom_dmaps_blockScratch.grid(row=group_row, column=1, sticky='ew')
+        name__plom_dmaps_blockScratch = "DMAPs scratch file"
+        info_msg__plom_dmaps_blockScratch = "Scratch file: If <Yes>, a <Dense (blocked)> kernel larger than half of <Block memory> is written once to a memory-mapped file in the job's output directory (N x N values, deleted after DMAPS) instead of being recomputed at every solver iteration. Used only if the disk has room for it.\n    Default = No"
+        opt_label__plom_dmaps_blockScratch.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_blockScratch, info_msg__plom_dmaps_blockScratch))
+        opt_value__plom_dmaps_blockScratch.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_dmaps_blockScratch, info_msg__plom_dmaps_blockScratch))
+        
+        #---------------------------------------------------------------------------------------------------#
+        
         frame__plom_dmaps.grid_columnconfigure(0, weight=0, minsize=150)  # Label column (fixed size)
         frame__plom_dmaps.grid_columnconfigure(1, weight=0, minsize=150)  # Entry column (expandable)
         frame__plom_dmaps.grid_columnconfigure(2, weight=1)
@@ -2381,6 +2747,20 @@ def launch_gui():
         
         #---------------------------------------------------------------------------------------------------#
         
+        group_row += 1
+        opt_save__plom_sampling_toFile = tk.StringVar(frame__plom_sampling)
+        opt_label__plom_sampling_toFile = tk.Label(frame__plom_sampling, text="Samples to file", anchor='w')
+        opt_label__plom_sampling_toFile.grid(row=group_row, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_sampling_toFile = ttk.Combobox(frame__plom_sampling, values=["Yes", "No"], state='readonly', textvariable=opt_save__plom_sampling_toFile)
+        opt_value__plom_sampling_toFile.current(1)
+        opt_value__plom_sampling_toFile.grid(row=group_row, column=1, sticky='ew')
+        name__plom_sampling_toFile = "Samples to file"
+        info_msg__plom_sampling_toFile = "Samples to file:\n    If <Yes>, once sampling is done the generated samples are written to samples.npy in the job's output directory (and samples.txt for the txt filetype) at the job precision, and the results dictionary keeps a reference to samples.npy instead of a copy, so result.dict stays small. Sampling itself still needs memory for all samples. The Results tab maps the samples file back when loading the results dictionary.\n    Default = No"
+        opt_label__plom_sampling_toFile.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sampling_toFile, info_msg__plom_sampling_toFile))
+        opt_value__plom_sampling_toFile.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sampling_toFile, info_msg__plom_sampling_toFile))
+        
+        #---------------------------------------------------------------------------------------------------#
+        
         group_row += 1
         sampling_parallel_options = ["Yes", "No"]
         opt_save__plom_sampling_parallel = tk.StringVar(frame__plom_sampling)
@@ -2404,7 +2784,7 @@ def launch_gui():
         opt_value__plom_sampling_njobs = tk.Entry(frame__plom_sampling, textvariable=opt_save__plom_sampling_njobs)
         opt_value__plom_sampling_njobs.grid(row=group_row, column=1, sticky='ew')
         name__plom_sampling_njobs = "Number of jobs"
-        info_msg__plom_sampling_njobs = "Number of jobs: int or -1\n    Number of cores used if Parallel sampling is True.\n    Default = -1 (use all available cores)"
+        info_msg__plom_sampling_njobs = "Number of jobs: int, -1 or auto\n    Number of cores used if Parallel sampling is True.\n    auto: the CPUs available to the job (affinity, cgroup quota and queue allotment), reduced so that the workers fit in the available memory.\n    Default = -1 (use all available cores)"
         opt_label__plom_sampling_njobs.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sampling_njobs, info_msg__plom_sampling_njobs))
         opt_value__plom_sampling_njobs.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sampling_njobs, info_msg__plom_sampling_njobs))
         
@@ -2415,7 +2795,7 @@ def launch_gui():
             what = S # inserted character
             # reason = V # reason for this callback: one of 'focusin', 'focusout', 'key', or 'forced' if the textvariable was changed
             
-            input_ok = what.isdigit() or what == "-" or what == ""
+            input_ok = what.isdigit() or what == "-" or what == "" or all(c in "auto" for c in what)
             
             if not input_ok:
                 input_str = opt_value__plom_sampling_njobs.get()
@@ -2425,7 +2805,7 @@ def launch_gui():
                 pattern_ok = value > 0 or value == -1
             except:
                 value = None
-                pattern_ok = False
+                pattern_ok = input_str.strip() == "auto"
             
             color = 'blue' if pattern_ok else 'red'
             
@@ -2569,6 +2949,127 @@ def launch_gui():
         browse_button__plom_job_path.grid(row=1, column=2, sticky='ew', padx=(5, 0))
         browse_button__plom_job_path.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event))
         
+        job_dataFormat_options = ["npy", "npz (compressed)", "txt"]
+        opt_save__plom_job_dataFormat = tk.StringVar(frame__plom_job)
+        opt_label__plom_job_dataFormat = tk.Label(frame__plom_job, text="Data format", anchor='w')
+        opt_label__plom_job_dataFormat.grid(row=2, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_dataFormat = ttk.Combobox(frame__plom_job, values=job_dataFormat_options, state='readonly', textvariable=opt_save__plom_job_dataFormat)
+        opt_value__plom_job_dataFormat.current(0)
+        opt_value__plom_job_dataFormat.grid(row=2, column=1, sticky='ew')
+        name__plom_job_dataFormat = "Job data format"
+        info_msg__plom_job_dataFormat = "Data format: File format of the training data written to the job directory.\n    <npy> and <npz (compressed)> are binary and fast to write and read; <txt> is human-readable.\n    Default = npy"
+        opt_label__plom_job_dataFormat.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_dataFormat, info_msg__plom_job_dataFormat))
+        opt_value__plom_job_dataFormat.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_dataFormat, info_msg__plom_job_dataFormat))
+        
+        opt_save__plom_job_saveText = tk.StringVar(frame__plom_job)
+        opt_label__plom_job_saveText = tk.Label(frame__plom_job, text="Text copy", anchor='w')
+        opt_label__plom_job_saveText.grid(row=3, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_saveText = ttk.Combobox(frame__plom_job, values=["Yes", "No"], state='readonly', textvariable=opt_save__plom_job_saveText)
+        opt_value__plom_job_saveText.current(1)
+        opt_value__plom_job_saveText.grid(row=3, column=1, sticky='ew')
+        name__plom_job_saveText = "Job data text copy"
+        info_msg__plom_job_saveText = "Text copy: If <Yes>, a human-readable copy of the training data (training.txt) is also saved in the job directory for auditing.\n    Default = No"
+        opt_label__plom_job_saveText.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_saveText, info_msg__plom_job_saveText))
+        opt_value__plom_job_saveText.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_saveText, info_msg__plom_job_saveText))
+        
+        opt_save__plom_job_dataCacheGB = tk.StringVar(frame__plom_job)
+        opt_save__plom_job_dataCacheGB.set("2")
+        opt_label__plom_job_dataCacheGB = tk.Label(frame__plom_job, text="Data cache (GB)", anchor='w')
+        opt_label__plom_job_dataCacheGB.grid(row=4, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_dataCacheGB = tk.Entry(frame__plom_job, textvariable=opt_save__plom_job_dataCacheGB)
+        opt_value__plom_job_dataCacheGB.grid(row=4, column=1, sticky='ew')
+        name__plom_job_dataCacheGB = "Job data cache size"
+        info_msg__plom_job_dataCacheGB = f"Data cache (GB): Size budget of the parsed training data cache in {DATA_CACHE_DIR}. Re-running a job on an unchanged data file with the same data options skips parsing. Least recently used entries are evicted when the budget is exceeded.\n    0 disables the cache.\n    Default = 2"
+        opt_label__plom_job_dataCacheGB.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_dataCacheGB, info_msg__plom_job_dataCacheGB))
+        opt_value__plom_job_dataCacheGB.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_dataCacheGB, info_msg__plom_job_dataCacheGB))
+        
+        def validate__plom_job_dataCacheGB(P, d, i, S, V):
+            ## input must be a non-negative number
+            input_ok = P.replace(".", "", 1).isdigit() or P == ""
+            if d == "0":
+                return True
+            return input_ok
+        
+        reg_val__validate__plom_job_dataCacheGB = root.register(validate__plom_job_dataCacheGB)
+        opt_value__plom_job_dataCacheGB.config(validate="key", validatecommand=(reg_val__validate__plom_job_dataCacheGB, '%P', '%d', '%i', '%S', '%V'))
+        
+        opt_save__plom_job_precision = tk.StringVar(frame__plom_job)
+        opt_label__plom_job_precision = tk.Label(frame__plom_job, text="Precision", anchor='w')
+        opt_label__plom_job_precision.grid(row=5, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_precision = ttk.Combobox(frame__plom_job, values=list(PRECISION_DTYPES), state='readonly', textvariable=opt_save__plom_job_precision)
+        opt_value__plom_job_precision.current(0)
+        opt_value__plom_job_precision.grid(row=5, column=1, sticky='ew')
+        name__plom_job_precision = "Job precision"
+        info_msg__plom_job_precision = "Precision: Storage precision of the training data, samples and results dictionary.\n    <float32> halves memory and disk usage; PLoM still computes in float64 internally and results are cast when saved and when loaded in the Results tab.\n    Default = float64"
+        opt_label__plom_job_precision.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_precision, info_msg__plom_job_precision))
+        opt_value__plom_job_precision.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_precision, info_msg__plom_job_precision))
+        
+        opt_save__plom_job_audit = tk.StringVar(frame__plom_job)
+        opt_label__plom_job_audit = tk.Label(frame__plom_job, text="Data audit", anchor='w')
+        opt_label__plom_job_audit.grid(row=6, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_audit = ttk.Combobox(frame__plom_job, values=AUDIT_MODES, state='readonly', textvariable=opt_save__plom_job_audit)
+        opt_value__plom_job_audit.current(0)
+        opt_value__plom_job_audit.grid(row=6, column=1, sticky='ew')
+        name__plom_job_audit = "Job data audit"
+        info_msg__plom_job_audit = "Data audit: Pre-flight check of the training data before the job is created: NaN/inf cells, constant columns and duplicate samples. Per-column statistics are saved to output/data_audit.csv.\n    <Block on errors> stops job creation if any is found; <Warn only> reports them.\n    Default = Block on errors"
+        opt_label__plom_job_audit.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_audit, info_msg__plom_job_audit))
+        opt_value__plom_job_audit.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_audit, info_msg__plom_job_audit))
+        
+        opt_save__plom_job_backend = tk.StringVar(frame__plom_job)
+        opt_label__plom_job_backend = tk.Label(frame__plom_job, text="Run in", anchor='w')
+        opt_label__plom_job_backend.grid(row=7, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_backend = ttk.Combobox(frame__plom_job, values=["Process", "Thread"], state='readonly', textvariable=opt_save__plom_job_backend)
+        opt_value__plom_job_backend.current(0)
+        opt_value__plom_job_backend.grid(row=7, column=1, sticky='ew')
+        name__plom_job_backend = "Job execution backend"
+        info_msg__plom_job_backend = "Run in: Where <Run job> executes the job.\n    <Process>: a separate worker process; the GUI stays responsive and a crashing or out-of-memory job cannot take it down. Log lines, status and results are relayed to the GUI.\n    <Thread>: a thread of the GUI process; thread jobs can run side by side with each other and with job processes, and start faster than a process.\n    Default = Process"
+        opt_label__plom_job_backend.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_backend, info_msg__plom_job_backend))
+        opt_value__plom_job_backend.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_backend, info_msg__plom_job_backend))
+        
+        opt_save__plom_job_shareData = tk.StringVar(frame__plom_job)
+        opt_label__plom_job_shareData = tk.Label(frame__plom_job, text="Share data", anchor='w')
+        opt_label__plom_job_shareData.grid(row=8, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_shareData = ttk.Combobox(frame__plom_job, values=["Yes", "No"], state='readonly', textvariable=opt_save__plom_job_shareData)
+        opt_value__plom_job_shareData.current(0)
+        opt_value__plom_job_shareData.grid(row=8, column=1, sticky='ew')
+        name__plom_job_shareData = "Job shared training data"
+        info_msg__plom_job_shareData = f"Share data: Queued jobs on the same training data (same data file and data options) map one read-only float64 copy of it, published by the first job in {SHARED_DATA_DIR}, instead of each loading its own. The copy is removed when the last of these jobs finishes.\n    Default = Yes"
+        opt_label__plom_job_shareData.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_shareData, info_msg__plom_job_shareData))
+        opt_value__plom_job_shareData.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_shareData, info_msg__plom_job_shareData))
+        
+        opt_save__plom_job_stageCache = tk.StringVar(frame__plom_job)
+        opt_label__plom_job_stageCache = tk.Label(frame__plom_job, text="Stage cache", anchor='w')
+        opt_label__plom_job_stageCache.grid(row=9, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_stageCache = ttk.Combobox(frame__plom_job, values=["Yes", "No"], state='readonly', textvariable=opt_save__plom_job_stageCache)
+        opt_value__plom_job_stageCache.current(0)
+        opt_value__plom_job_stageCache.grid(row=9, column=1, sticky='ew')
+        name__plom_job_stageCache = "Job stage cache"
+        info_msg__plom_job_stageCache = f"Stage cache: Scaling, PCA, DMAPS and projection results are cached in {STAGE_CACHE_DIR}, keyed by the training data and the options each stage depends on. A job that only changes later options (e.g. number of samples or Ito steps) reuses them; the log lists the stages that were cache hits. Uses the Data cache (GB) budget; 0 disables it.\n    Default = Yes"
+        opt_label__plom_job_stageCache.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_stageCache, info_msg__plom_job_stageCache))
+        opt_value__plom_job_stageCache.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_stageCache, info_msg__plom_job_stageCache))
+        
+        opt_save__plom_job_timeoutMin = tk.StringVar(frame__plom_job)
+        opt_save__plom_job_timeoutMin.set("0")
+        opt_label__plom_job_timeoutMin = tk.Label(frame__plom_job, text="Timeout (min)", anchor='w')
+        opt_label__plom_job_timeoutMin.grid(row=10, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_timeoutMin = tk.Entry(frame__plom_job, textvariable=opt_save__plom_job_timeoutMin)
+        opt_value__plom_job_timeoutMin.grid(row=10, column=1, sticky='ew')
+        name__plom_job_timeoutMin = "Job timeout"
+        info_msg__plom_job_timeoutMin = "Timeout (min): Wall-clock limit of a running job. A job that exceeds it is stopped like a cancelled one and its status is <timed out>; output/status.json records the state of the job directory (running, completed, failed, cancelled, timed out).\n    Process jobs are terminated together with their parallel sampling workers; Thread jobs stop at the next PLoM stage boundary.\n    0 = no limit. Default = 0"
+        opt_label__plom_job_timeoutMin.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_timeoutMin, info_msg__plom_job_timeoutMin))
+        opt_value__plom_job_timeoutMin.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_timeoutMin, info_msg__plom_job_timeoutMin))
+        
+        opt_save__plom_job_memoryGuard = tk.StringVar(frame__plom_job)
+        opt_label__plom_job_memoryGuard = tk.Label(frame__plom_job, text="Memory guard", anchor='w')
+        opt_label__plom_job_memoryGuard.grid(row=11, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_job_memoryGuard = ttk.Combobox(frame__plom_job, values=MEMORY_GUARDS, state='readonly', textvariable=opt_save__plom_job_memoryGuard)
+        opt_value__plom_job_memoryGuard.current(0)
+        opt_value__plom_job_memoryGuard.grid(row=11, column=1, sticky='ew')
+        name__plom_job_memoryGuard = "Job memory guard"
+        info_msg__plom_job_memoryGuard = "Memory guard: What happens when the estimated peak memory of a job (see Estimate) exceeds the memory available on this machine.\n    <Warn>: the job runs and the estimate is written to the log.\n    <Refuse>: the job is not queued (nor created), with the estimate in the log.\n    <Off>: no check.\n    The check is repeated on the exact data shape once the training data is loaded.\n    Default = Warn"
+        opt_label__plom_job_memoryGuard.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_memoryGuard, info_msg__plom_job_memoryGuard))
+        opt_value__plom_job_memoryGuard.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_job_memoryGuard, info_msg__plom_job_memoryGuard))
+        
         def validate__plom_job_path(P, d, i, S, V):
             input_str = P
             why = d # action code: 0 for deletion, 1 for insertion, or -1 for focus in, focus out, or a change to the textvariable
@@ -2612,14 +3113,97 @@ def launch_gui():
         ################################################################################
         ################################################################################
         
+        # Group: parameter sweep options
+        current_row += 1
+        frame__plom_sweep = tk.LabelFrame(plom_settings_frame2, text="Sweep", padx=10, pady=10, font=("Arial", 10, "bold"))
+        frame__plom_sweep.grid(row=current_row, column=0, columnspan=3, sticky='ew', padx=10, pady=(10, 5))
+        name__plom_sweep = "PLoM Parameter Sweep"
+        info_msg__plom_sweep = "Sweep: <Run sweep> creates one job per design point under <Job path>/<Job name>, sharing a single copy of the training data, and runs them through the job queue. Fields left blank keep the value set above.\n    Values: comma-separated list (e.g. 0.5, 1, 2), range <start:stop:num> or geometric range <start:stop:num:log>.\n    A table of timings and key metrics is saved to sweep_results.csv when all points have finished."
+        frame__plom_sweep.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sweep, info_msg__plom_sweep))
+        
+        opt_save__plom_sweep_values = {}
+        for group_row, field in enumerate(SWEEP_FIELDS):
+            opt_save__plom_sweep_values[field] = tk.StringVar(frame__plom_sweep)
+            opt_label__plom_sweep_field = tk.Label(frame__plom_sweep, text=field, anchor='w')
+            opt_label__plom_sweep_field.grid(row=group_row, column=0, sticky='w', padx=(0, 5))
+            opt_value__plom_sweep_field = tk.Entry(frame__plom_sweep, textvariable=opt_save__plom_sweep_values[field])
+            opt_value__plom_sweep_field.grid(row=group_row, column=1, sticky='ew')
+            opt_label__plom_sweep_field.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sweep, info_msg__plom_sweep))
+            opt_value__plom_sweep_field.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sweep, info_msg__plom_sweep))
+        
+        group_row += 1
+        opt_save__plom_sweep_design = tk.StringVar(frame__plom_sweep)
+        opt_label__plom_sweep_design = tk.Label(frame__plom_sweep, text="Design", anchor='w')
+        opt_label__plom_sweep_design.grid(row=group_row, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_sweep_design = ttk.Combobox(frame__plom_sweep, values=SWEEP_DESIGNS, state='readonly', textvariable=opt_save__plom_sweep_design)
+        opt_value__plom_sweep_design.current(0)
+        opt_value__plom_sweep_design.grid(row=group_row, column=1, sticky='ew')
+        name__plom_sweep_design = "Sweep design"
+        info_msg__plom_sweep_design = "Design:\n    <Grid>: every combination of the listed values (ranges give <num> evenly spaced values).\n    <Random>: <Random points> draws; ranges are sampled uniformly (log-uniformly for geometric ranges) and lists by random choice.\n    Default = Grid"
+        opt_label__plom_sweep_design.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sweep_design, info_msg__plom_sweep_design))
+        opt_value__plom_sweep_design.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sweep_design, info_msg__plom_sweep_design))
+        
+        group_row += 1
+        opt_save__plom_sweep_nPoints = tk.StringVar(frame__plom_sweep)
+        opt_save__plom_sweep_nPoints.set('10')
+        opt_label__plom_sweep_nPoints = tk.Label(frame__plom_sweep, text="Random points", anchor='w')
+        opt_label__plom_sweep_nPoints.grid(row=group_row, column=0, sticky='w', padx=(0, 5))
+        opt_value__plom_sweep_nPoints = tk.Entry(frame__plom_sweep, textvariable=opt_save__plom_sweep_nPoints)
+        opt_value__plom_sweep_nPoints.grid(row=group_row, column=1, sticky='ew')
+        opt_label__plom_sweep_nPoints.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sweep_design, info_msg__plom_sweep_design))
+        opt_value__plom_sweep_nPoints.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_sweep_design, info_msg__plom_sweep_design))
+        
+        frame__plom_sweep.grid_columnconfigure(0, weight=0, minsize=150)  # Label column (fixed size)
+        frame__plom_sweep.grid_columnconfigure(1, weight=0, minsize=150)  # Entry column (expandable)
+        frame__plom_sweep.grid_columnconfigure(2, weight=1)
+        
+        ################################################################################
+        ################################################################################
+        
         # Add Submit button
         current_row += 1
-        button_createJob = tk.Button(plom_settings_frame2, text="Create job", command=create_job, state="disabled")
+        button_createJob = tk.Button(plom_settings_frame2, text="Create job", command=lambda: create_job(get_plom_gui_input()), state="disabled")
         button_createJob.grid(row=current_row, column=0, sticky='w', padx=10, pady=(20, 0))
         
-        button_runJob = tk.Button(plom_settings_frame2, text="Run job", command=run_job_thread, state="disabled")
+        button_runJob = tk.Button(plom_settings_frame2, text="Run job", command=run_job_thread, state="disabled") # submits to the job queue
         button_runJob.grid(row=current_row, column=1, sticky='w', padx=10, pady=(20, 0))
         
+        button_runSweep = tk.Button(plom_settings_frame2, text="Run sweep", command=run_sweep, state="disabled")
+        button_runSweep.grid(row=current_row, column=2, sticky='w', padx=10, pady=(20, 0))
+        
+        button_cancelJob = tk.Button(plom_settings_frame2, text="Cancel job", command=cancel_current_job)
+        button_cancelJob.grid(row=current_row, column=3, sticky='w', padx=10, pady=(20, 0))
+        
+        current_row += 1
+        frame__plom_estimate = tk.LabelFrame(plom_settings_frame2, text="Estimate", padx=10, pady=10, font=("Arial", 10, "bold"))
+        frame__plom_estimate.grid(row=current_row, column=0, columnspan=4, sticky='ew', padx=10, pady=(10, 5))
+        name__plom_estimate = "Job estimate"
+        info_msg__plom_estimate = "Estimate: Predicted peak memory and runtime of each stage, from the shape of the training data (read from the file preview) and the current PCA, DMAPS and sampling options. It is refreshed by <Estimate> and by <Run job>.\n    Runtimes are calibrated on the profiles of past jobs on this machine (~/.plom/profiles.jsonl) and use default rates until there are some; both figures are order-of-magnitude guides.\n    Warnings in red flag stages that would not fit in the available memory, e.g. the dense N x N DMAPS kernel of a large training set."
+        frame__plom_estimate.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_estimate, info_msg__plom_estimate))
+        
+        button_estimate = tk.Button(frame__plom_estimate, text="Estimate", command=update_estimate)
+        button_estimate.grid(row=0, column=0, sticky='nw')
+        estimate_label = tk.Label(frame__plom_estimate, text="", anchor='w', justify='left', font=("Courier", 9))
+        estimate_label.grid(row=0, column=1, sticky='w', padx=(10, 0))
+        estimate_warnings = tk.Label(frame__plom_estimate, text="", anchor='w', justify='left', fg='red', wraplength=380)
+        estimate_warnings.grid(row=1, column=0, columnspan=2, sticky='w', pady=(5, 0))
+        frame__plom_estimate.grid_columnconfigure(1, weight=1)
+        
+        current_row += 1
+        frame__plom_progress = tk.LabelFrame(plom_settings_frame2, text="Progress", padx=10, pady=10, font=("Arial", 10, "bold"))
+        frame__plom_progress.grid(row=current_row, column=0, columnspan=4, sticky='ew', padx=10, pady=(10, 5))
+        name__plom_progress = "Job progress"
+        info_msg__plom_progress = "Progress: Stage and elapsed time of the most recently started running job. During parallel sampling, the bar follows the number of generated samples and an ETA is shown.\n    Every job also records its progress events (stage start/end, sample counts) in output/progress.jsonl."
+        frame__plom_progress.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__plom_progress, info_msg__plom_progress))
+        
+        progress_label = tk.Label(frame__plom_progress, text="No running job", anchor='w')
+        progress_label.grid(row=0, column=0, columnspan=2, sticky='w')
+        progress_bar = ttk.Progressbar(frame__plom_progress, orient='horizontal', mode='determinate', maximum=100)
+        progress_bar.grid(row=1, column=0, sticky='ew', pady=(5, 0))
+        progress_eta = tk.Label(frame__plom_progress, text="", anchor='w')
+        progress_eta.grid(row=1, column=1, sticky='w', padx=(10, 0), pady=(5, 0))
+        frame__plom_progress.grid_columnconfigure(0, weight=1, minsize=200)
+        
         ################################################################################
         ################################################################################
         
@@ -2665,7 +3249,10 @@ def launch_gui():
             # Function to load the results file from the path entered
             file_path = results_entry.get()
             try:
-                job_dict = load_dict(file_path)
+                job_dict = load_result_dict(file_path)
+                dtype = PRECISION_DTYPES[opt_save__plom_job_precision.get().strip()]
+                if dtype != np.float64:
+                    cast_float_arrays(job_dict, dtype)
                 status_label.config(text="Results dictionary loaded successfully", fg="green")
                 # print(job_dict.keys())
             except:
@@ -3307,6 +3894,73 @@ def launch_gui():
 
     
     
+    #*****************************************************************************#
+    
+    #*********************************   JOB QUEUE TAB ***************************#
+    
+    if tab_switch__jobQueue:
+        
+        frame__job_queue_budget = tk.LabelFrame(jobQueue_tab, text="Budget", padx=10, pady=10, font=("Arial", 10, "bold"))
+        frame__job_queue_budget.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(10, 5))
+        
+        opt_save__job_queue_maxJobs = tk.StringVar(frame__job_queue_budget)
+        opt_save__job_queue_maxJobs.set(str(available_cores()))
+        opt_label__job_queue_maxJobs = tk.Label(frame__job_queue_budget, text="Max concurrent jobs", anchor='w')
+        opt_label__job_queue_maxJobs.grid(row=0, column=0, sticky='w', padx=(0, 5))
+        opt_value__job_queue_maxJobs = tk.Entry(frame__job_queue_budget, textvariable=opt_save__job_queue_maxJobs, width=8)
+        opt_value__job_queue_maxJobs.grid(row=0, column=1, sticky='w')
+        name__job_queue_maxJobs = "Max concurrent jobs"
+        info_msg__job_queue_maxJobs = "Max concurrent jobs: Upper bound on the number of queued jobs running at the same time."
+        opt_label__job_queue_maxJobs.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__job_queue_maxJobs, info_msg__job_queue_maxJobs))
+        opt_value__job_queue_maxJobs.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__job_queue_maxJobs, info_msg__job_queue_maxJobs))
+        
+        opt_save__job_queue_cores = tk.StringVar(frame__job_queue_budget)
+        opt_save__job_queue_cores.set(str(available_cores()))
+        opt_label__job_queue_cores = tk.Label(frame__job_queue_budget, text="Core budget", anchor='w')
+        opt_label__job_queue_cores.grid(row=0, column=2, sticky='w', padx=(20, 5))
+        opt_value__job_queue_cores = tk.Entry(frame__job_queue_budget, textvariable=opt_save__job_queue_cores, width=8)
+        opt_value__job_queue_cores.grid(row=0, column=3, sticky='w')
+        name__job_queue_cores = "Core budget"
+        info_msg__job_queue_cores = f"Core budget: Total cores shared by running jobs ({available_cores()} available).\n    A job with parallel sampling occupies <Number of jobs> cores (-1 = the whole budget) and its sampling workers are capped accordingly; other jobs occupy one core. BLAS/OpenMP thread pools of job processes are sized to their cores."
+        opt_label__job_queue_cores.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__job_queue_cores, info_msg__job_queue_cores))
+        opt_value__job_queue_cores.bind("<Button-1>", lambda event: set_info_msg_on_widget_click(event, name__job_queue_cores, info_msg__job_queue_cores))
+        
+        opt_save__job_queue_maxJobs.trace_add("write", lambda *args: schedule_jobs())
+        opt_save__job_queue_cores.trace_add("write", lambda *args: schedule_jobs())
+        
+        job_queue_summary = tk.Label(frame__job_queue_budget, text="", anchor='w')
+        job_queue_summary.grid(row=0, column=4, sticky='w', padx=(20, 0))
+        
+        frame__job_queue_jobs = tk.Frame(jobQueue_tab)
+        frame__job_queue_jobs.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        job_queue_columns = ("#", "Job", "Cores", "Run in", "Status", "Submitted", "Started", "Elapsed")
+        job_queue_tree = ttk.Treeview(frame__job_queue_jobs, columns=job_queue_columns, show='headings', selectmode='extended')
+        for column in job_queue_columns:
+            job_queue_tree.heading(column, text=column)
+            job_queue_tree.column(column, width=220 if column == "Job" else 90, anchor='w')
+        job_queue_scrollbar = ttk.Scrollbar(frame__job_queue_jobs, orient='vertical', command=job_queue_tree.yview)
+        job_queue_tree.configure(yscrollcommand=job_queue_scrollbar.set)
+        job_queue_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        job_queue_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        frame__job_queue_buttons = tk.Frame(jobQueue_tab)
+        frame__job_queue_buttons.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(5, 10))
+        
+        button_jobUp = tk.Button(frame__job_queue_buttons, text="Move up", command=lambda: move_selected_jobs(-1))
+        button_jobUp.pack(side=tk.LEFT, padx=(0, 5))
+        button_jobDown = tk.Button(frame__job_queue_buttons, text="Move down", command=lambda: move_selected_jobs(1))
+        button_jobDown.pack(side=tk.LEFT, padx=5)
+        button_jobPause = tk.Button(frame__job_queue_buttons, text="Pause / Resume", command=toggle_pause_selected_jobs)
+        button_jobPause.pack(side=tk.LEFT, padx=5)
+        button_jobCancel = tk.Button(frame__job_queue_buttons, text="Cancel", command=cancel_selected_jobs)
+        button_jobCancel.pack(side=tk.LEFT, padx=5)
+        button_jobClear = tk.Button(frame__job_queue_buttons, text="Clear finished", command=clear_finished_jobs)
+        button_jobClear.pack(side=tk.LEFT, padx=5)
+        
+        update_queue_summary()
+    
+    
     #*****************************************************************************#
     
     #**************************   DIAGNOSTICS RESULTS TAB ************************#
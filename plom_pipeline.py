@@ -0,0 +1,2954 @@
+import os
+import sys
+import mmap
+import shutil
+import hashlib
+import json
+import time
+import traceback
+import itertools
+import math
+import csv
+import multiprocessing
+import threading
+import pickle
+import argparse
+import signal
+import platform
+import numpy as np
+from plom import parse_input, initialize, run, save_dict, load_dict, save_summary
+
+HOME_DIR = os.path.expanduser("~")
+PLOM_DIR = os.path.join(HOME_DIR, '.plom')
+DATA_CACHE_DIR = os.path.join(PLOM_DIR, 'cache')
+SHARED_DATA_DIR = os.path.join(PLOM_DIR, 'shared')
+STAGE_CACHE_DIR = os.path.join(PLOM_DIR, 'stages')
+PROFILE_HISTORY = os.path.join(PLOM_DIR, 'profiles.jsonl') # profiles of past jobs, calibrate the estimator
+
+TEXT_CHUNK_ROWS = 100_000 # rows parsed per chunk by the delimited-text reader
+
+PARQUET_EXTENSIONS = ['parquet', 'pq']
+FEATHER_EXTENSIONS = ['feather', 'arrow', 'ipc']
+HDF5_EXTENSIONS = ['h5', 'hdf5', 'he5']
+COLUMNAR_EXTENSIONS = PARQUET_EXTENSIONS + FEATHER_EXTENSIONS + HDF5_EXTENSIONS
+EXCEL_EXTENSIONS = ['xls', 'xlsx', 'xlsm', 'xlsb']
+
+SNIFF_BYTES = 64 * 1024 # head of a text file read to preview it
+
+PRECISION_DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+AUDIT_CHUNK_ROWS = 65_536 # rows audited per chunk
+AUDIT_MODES = ["Block on errors", "Warn only", "Off"]
+
+# options added after the first session format, for session files saved before they existed
+SESSION_DEFAULTS = {
+    'sampling_toFile': 'No',
+    'dmaps_kernel': 'Dense',
+    'dmaps_neighbors': '32',
+    'dmaps_blockMB': '512',
+    'dmaps_blockPrecision': 'float64',
+    'dmaps_blockScratch': 'No',
+    'job_dataFormat': 'npy',
+    'job_saveText': 'No',
+    'job_dataCacheGB': '2',
+    'job_precision': 'float64',
+    'job_audit': AUDIT_MODES[0],
+    'job_backend': 'Process',
+    'job_shareData': 'Yes',
+    'job_stageCache': 'Yes',
+    'job_timeoutMin': '0',
+    'job_memoryGuard': 'Warn',
+    }
+
+
+def reflink_file(src, dst):
+    # copy-on-write clone (Linux btrfs/xfs); raises OSError if unsupported
+    import fcntl
+    FICLONE = 0x40049409
+    with open(src, 'rb') as f_src, open(dst, 'wb') as f_dst:
+        try:
+            fcntl.ioctl(f_dst.fileno(), FICLONE, f_src.fileno())
+        except OSError:
+            f_dst.close()
+            os.remove(dst)
+            raise
+
+
+def link_file(src, dst, allow_symlink=True):
+    # place src at dst without re-encoding it: hardlink, reflink, symlink, then plain copy
+    src = os.path.abspath(src)
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return 'same file'
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError:
+        pass
+    try:
+        reflink_file(src, dst)
+        return 'reflink'
+    except (ImportError, OSError):
+        pass
+    if allow_symlink:
+        try:
+            os.symlink(src, dst)
+            return 'symlink'
+        except OSError:
+            pass
+    shutil.copyfile(src, dst)
+    return 'copy'
+
+
+def save_training_file(path, data, data_format='npy'):
+    if os.path.lexists(path):
+        os.remove(path) # may be a link to the source file or to a cache entry, never write through it
+    if data_format == 'npy':
+        np.save(path, data)
+    elif data_format == 'npz':
+        np.savez_compressed(path, training=data)
+    else:
+        np.savetxt(path, data, fmt=text_fmt(data))
+
+
+def text_fmt(data):
+    # enough digits to round-trip the stored precision
+    return '%.9g' if data.dtype == np.float32 else '%.18e'
+
+
+def precision_dtype(plom_gui_input):
+    return PRECISION_DTYPES.get(plom_gui_input.get('job_precision', 'float64').strip(), np.float64)
+
+
+def cast_float_arrays(obj, dtype):
+    # cast every floating-point array of a (nested) results dictionary in place
+    items = obj.items() if isinstance(obj, dict) else enumerate(obj) if isinstance(obj, list) else []
+    for key, value in items:
+        if isinstance(value, np.ndarray) and np.issubdtype(value.dtype, np.floating) and value.dtype != dtype:
+            obj[key] = value.astype(dtype)
+        elif isinstance(value, (dict, list)):
+            cast_float_arrays(value, dtype)
+    return obj
+
+
+def save_samples_file(path, samples, samples_fmt='txt'):
+    if os.path.lexists(path):
+        os.remove(path)
+    if samples_fmt == 'npy':
+        np.save(path, samples)
+    else:
+        np.savetxt(path, samples, fmt=text_fmt(samples))
+
+
+def load_training_file(path, mmap_mode=None):
+    extension = path.split('.')[-1]
+    if extension == 'npy':
+        return np.load(path, mmap_mode=mmap_mode)
+    if extension == 'npz':
+        with np.load(path) as f:
+            return f['training']
+    return np.loadtxt(path)
+
+
+def training_fname_for(plom_gui_input):
+    # job training file name for the selected job data format, e.g. " npz (compressed)" -> training.npz
+    data_format = plom_gui_input['job_dataFormat'].split()[0]
+    return f'training.{data_format}'
+
+
+def is_whole_npy_memmap(data):
+    # True if data is the untouched memory map of a .npy file (not a view or a selection of it)
+    return (isinstance(data, np.memmap) and isinstance(data.base, mmap.mmap) 
+            and str(data.filename).endswith('.npy'))
+
+
+def index_mask(spec, n):
+    # keep-mask of length n for an ignore list such as "0, 5:10, 20" (0-indexed, inclusive ranges)
+    keep = np.ones(n, dtype=bool)
+    if type(spec) == str:
+        spec = spec.replace(' ', '').split(',')
+    for el in spec:
+        el = str(el)
+        if el == "":
+            continue
+        start, _, end = el.partition(":")
+        start, end = int(start), int(end or start)
+        # out-of-bounds indices are errors, as they were for np.delete: negative ones would otherwise 
+        # silently count back from the end
+        for index in [start, end]:
+            if not 0 <= index < n:
+                raise IndexError(f'ignore index {index} is out of bounds for size {n}')
+        keep[start:end+1] = False
+    return keep
+
+
+def selection_plan(n_rows, n_cols, rowIgnore=[], colIgnore=[], hasIndices=False, columnsAre='Features'):
+    # row/column keep-masks in file coordinates: ignore lists refer to the file as read, the data is 
+    # then transposed if columns are samples, and the first column of that (sample indices) is dropped
+    plan = {
+        'rows': index_mask(rowIgnore, n_rows),
+        'cols': index_mask(colIgnore, n_cols),
+        'transpose': columnsAre.strip() == 'Samples',
+        }
+    if hasIndices:
+        keep = plan['rows'] if plan['transpose'] else plan['cols']
+        keep[np.flatnonzero(keep)[:1]] = False
+    return plan
+
+
+def mask_to_index(mask):
+    # slice when the kept block is contiguous (selection stays a view), index array otherwise
+    idx = np.flatnonzero(mask)
+    if idx.size > 0 and idx[-1] - idx[0] + 1 == idx.size:
+        return slice(int(idx[0]), int(idx[-1]) + 1)
+    return idx
+
+
+def apply_selection_plan(data, plan):
+    # all selections and the transpose as a single gather into a C-contiguous array
+    rows, cols = plan['rows'], plan['cols']
+    if rows.all() and cols.all() and not plan['transpose']:
+        return data
+    if plan['transpose']:
+        data, rows, cols = data.T, cols, rows
+    row_idx, col_idx = mask_to_index(rows), mask_to_index(cols)
+    if isinstance(row_idx, slice) and isinstance(col_idx, slice):
+        data = data[row_idx, col_idx]
+        if isinstance(data, np.memmap):
+            return data # strided view of the file, streamed when saved
+        return np.ascontiguousarray(data)
+    # np.ix_ gathers into a new C-contiguous array whatever the orientation of data
+    return data[np.ix_(np.flatnonzero(rows), np.flatnonzero(cols))]
+
+
+def parse_delimiter(delimiter, file_extension):
+    # GUI delimiter option -> separator string, None meaning any whitespace
+    if file_extension == "csv":
+        return ','
+    if delimiter is None or 'Default' in delimiter:
+        return None
+    if 'comma' in delimiter:
+        return ','
+    if 'Tab' in delimiter:
+        return '\t'
+    return delimiter
+
+
+def count_lines(path, block_size=1<<24):
+    n_lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            n_lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        n_lines += 1
+    return n_lines
+
+
+def first_data_line(path, skip_header=0):
+    with open(path, 'r') as f:
+        for i, line in enumerate(f):
+            if i < skip_header:
+                continue
+            line = line.split('#')[0].strip()
+            if line:
+                return line
+    return ""
+
+
+def read_delimited(path, delimiter=None, skip_header=0, rowIgnore=[], colIgnore=[], 
+                   hasIndices=False, columnsAre='Features', chunk_rows=TEXT_CHUNK_ROWS, dtype=np.float64):
+    # C-engine parse in chunks straight into the preallocated final array: ignored columns are 
+    # never parsed, ignored rows are dropped chunk by chunk and transposition happens on the fly
+    line = first_data_line(path, skip_header)
+    n_cols = len(line.split(delimiter)) if delimiter else len(line.split())
+    n_rows = count_lines(path) - skip_header # upper bound, blank and comment lines are skipped by the parser
+    
+    plan = selection_plan(n_rows, n_cols, rowIgnore, colIgnore, hasIndices, columnsAre)
+    row_keep = plan['rows']
+    usecols = np.flatnonzero(plan['cols'])
+    n_out = int(row_keep.sum())
+    if plan['transpose']:
+        data = np.empty((usecols.size, n_out), dtype=dtype)
+    else:
+        data = np.empty((n_out, usecols.size), dtype=dtype)
+    
+    import pandas as pd
+    reader = pd.read_csv(path, sep=delimiter if delimiter else r'\s+', header=None, 
+                         skiprows=skip_header, usecols=usecols, dtype=np.float64, 
+                         comment='#', chunksize=chunk_rows, engine='c')
+    
+    print(f'Parsing "{path}" ({n_cols} columns, up to {n_rows} rows)')
+    n_read = 0
+    n_kept = 0
+    next_report = 0.1
+    for chunk in reader:
+        values = chunk.to_numpy()
+        n_chunk = len(values)
+        keep = row_keep[n_read:n_read+n_chunk]
+        n = int(keep.sum())
+        if n < n_chunk:
+            values = values[keep]
+        if plan['transpose']:
+            data[:, n_kept:n_kept+n] = values.T
+        else:
+            data[n_kept:n_kept+n] = values
+        n_kept += n
+        n_read += n_chunk
+        if n_read >= next_report * n_rows:
+            print(f'    {n_read} of up to {n_rows} rows parsed')
+            next_report = n_read / n_rows + 0.1
+    
+    # the row mask was sized on the line count, so ignore indices past the parsed rows are only 
+    # caught here
+    past_end = np.flatnonzero(~row_keep[n_read:])
+    if past_end.size:
+        raise IndexError(f'ignore index {n_read + past_end[-1]} is out of bounds for size {n_read}')
+    if n_kept == n_out:
+        return data
+    if plan['transpose']:
+        return np.ascontiguousarray(data[:, :n_kept]) # only when blank or comment lines were counted
+    return data[:n_kept]
+
+
+def kept_blocks(row_keep, block_bounds):
+    # (block number, keep-mask within block) for every block of rows holding at least one kept row
+    for i in range(len(block_bounds) - 1):
+        keep = row_keep[block_bounds[i]:block_bounds[i+1]]
+        if keep.any():
+            yield i, keep
+
+
+def fill_from_blocks(blocks, plan, dtype=np.float64):
+    # write (values, keep-mask) row blocks into the preallocated output, transposing on the fly
+    n_out, n_cols = int(plan['rows'].sum()), int(plan['cols'].sum())
+    data = np.empty((n_cols, n_out) if plan['transpose'] else (n_out, n_cols), dtype=dtype)
+    n_kept = 0
+    for values, keep in blocks:
+        n = int(keep.sum())
+        if plan['transpose']:
+            for j, column in enumerate(values):
+                data[j, n_kept:n_kept+n] = np.asarray(column, dtype=np.float64)[keep]
+        else:
+            for j, column in enumerate(values):
+                data[n_kept:n_kept+n, j] = np.asarray(column, dtype=np.float64)[keep]
+        n_kept += n
+    return data
+
+
+def read_parquet(path, rowIgnore=[], colIgnore=[], hasIndices=False, columnsAre='Features', dtype=np.float64):
+    # only the kept columns are decoded, and only from row groups holding kept rows
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(path)
+    names = pf.schema_arrow.names
+    plan = selection_plan(pf.metadata.num_rows, len(names), rowIgnore, colIgnore, hasIndices, columnsAre)
+    columns = [names[i] for i in np.flatnonzero(plan['cols'])]
+    bounds = np.cumsum([0] + [pf.metadata.row_group(i).num_rows for i in range(pf.num_row_groups)])
+    print(f'Reading "{path}" ({len(columns)} of {len(names)} columns, '
+          f'{int(plan["rows"].sum())} of {pf.metadata.num_rows} rows)')
+    blocks = ((pf.read_row_group(i, columns=columns).columns, keep) 
+              for i, keep in kept_blocks(plan['rows'], bounds))
+    return fill_from_blocks(blocks, plan, dtype)
+
+
+def read_feather(path, rowIgnore=[], colIgnore=[], hasIndices=False, columnsAre='Features', dtype=np.float64):
+    # Feather v2 / Arrow IPC file: memory-mapped, only kept columns of record batches holding kept rows are touched
+    import pyarrow as pa
+    import pyarrow.ipc
+    with pa.memory_map(path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        names = reader.schema.names
+        batch_rows = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+        bounds = np.cumsum([0] + batch_rows)
+        plan = selection_plan(int(bounds[-1]), len(names), rowIgnore, colIgnore, hasIndices, columnsAre)
+        col_idx = np.flatnonzero(plan['cols']).tolist()
+        print(f'Reading "{path}" ({len(col_idx)} of {len(names)} columns, '
+              f'{int(plan["rows"].sum())} of {int(bounds[-1])} rows)')
+        blocks = (([reader.get_batch(i).column(j) for j in col_idx], keep) 
+                  for i, keep in kept_blocks(plan['rows'], bounds))
+        return fill_from_blocks(blocks, plan, dtype)
+
+
+def hdf5_dataset_name(h5file, name=None):
+    # named dataset, or the first 2-D dataset in the file
+    if name:
+        return name
+    found = []
+    def visit(key, obj):
+        if not found and getattr(obj, 'ndim', 0) == 2:
+            found.append(key)
+    h5file.visititems(visit)
+    if not found:
+        raise ValueError('No 2-D dataset found in HDF5 file')
+    return found[0]
+
+
+def read_hdf5(path, dataset=None, rowIgnore=[], colIgnore=[], hasIndices=False, columnsAre='Features', 
+              chunk_rows=TEXT_CHUNK_ROWS, dtype=np.float64):
+    # hyperslab reads: the span of kept rows is read in blocks, restricted to the kept columns
+    import h5py
+    with h5py.File(path, 'r') as f:
+        dataset = hdf5_dataset_name(f, dataset)
+        ds = f[dataset]
+        n_rows, n_cols = ds.shape
+        plan = selection_plan(n_rows, n_cols, rowIgnore, colIgnore, hasIndices, columnsAre)
+        col_idx = mask_to_index(plan['cols'])
+        row_idx = np.flatnonzero(plan['rows'])
+        print(f'Reading "{path}:{dataset}" ({int(plan["cols"].sum())} of {n_cols} columns, '
+              f'{row_idx.size} of {n_rows} rows)')
+        if row_idx.size == 0:
+            bounds = [0]
+        else:
+            bounds = list(range(int(row_idx[0]), int(row_idx[-1]) + 1, chunk_rows)) + [int(row_idx[-1]) + 1]
+        def blocks():
+            for i in range(len(bounds) - 1):
+                keep = plan['rows'][bounds[i]:bounds[i+1]]
+                if keep.any():
+                    yield ds[bounds[i]:bounds[i+1], col_idx].T, keep
+        return fill_from_blocks(blocks(), plan, dtype)
+
+
+def is_number(token):
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def sniff_text(path, max_bytes=SNIFF_BYTES):
+    # delimiter, header and shape of a delimited text file from its first max_bytes
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        head = f.read(max_bytes)
+    lines = head.decode('utf-8', errors='replace').splitlines()
+    complete = len(head) >= size
+    if not complete and lines:
+        lines = lines[:-1] # last line may be cut
+    lines = [line.split('#')[0].strip() for line in lines]
+    lines = [line for line in lines if line]
+    if not lines:
+        return {'summary': 'No data found in the first lines of the file'}
+    
+    body = lines[1:] if len(lines) > 1 else lines
+    delimiter, n_cols = ' (Default)', len(body[0].split())
+    for name, sep in [(' , (comma)', ','), (' Tab', '\t')]:
+        counts = {len(line.split(sep)) for line in body}
+        if len(counts) == 1 and counts.pop() > 1:
+            delimiter, n_cols = name, len(body[0].split(sep))
+            break
+    sep = {' , (comma)': ',', ' Tab': '\t'}.get(delimiter)
+    has_labels = (not all(is_number(t) for t in lines[0].split(sep)) 
+                  and all(is_number(t) for t in body[0].split(sep)))
+    
+    n_rows = len(lines) - int(has_labels)
+    rows = f'{n_rows}'
+    if not complete:
+        rows = f'~{int(n_rows * size / len(head))}'
+    summary = (f'{rows} rows x {n_cols} columns, delimiter "{delimiter.strip()}"' 
+               + (', header row detected' if has_labels else ''))
+    return {'summary': summary, 'delimiter': delimiter, 'hasLabels': has_labels, 
+            'shape': (int(rows.lstrip('~')), n_cols)}
+
+
+def sniff_npy(path):
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+    dims = ' x '.join(str(n) for n in shape)
+    return {'summary': f'{dims} array of {dtype}', 'shape': shape}
+
+
+_EXCEL_META_CACHE = {} # (path, size, mtime) -> sheet info, shared by preview and ingest
+
+
+def excel_sheet_info(path):
+    # [(sheet name, rows, columns)], read from the workbook metadata only where the format allows it
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key in _EXCEL_META_CACHE:
+        return _EXCEL_META_CACHE[key]
+    if path.split('.')[-1] in ['xlsx', 'xlsm']:
+        import openpyxl
+        wb = openpyxl.load_workbook(path, read_only=True)
+        try:
+            info = [(ws.title, ws.max_row, ws.max_column) for ws in wb.worksheets]
+        finally:
+            wb.close()
+    else:
+        import pandas as pd
+        with pd.ExcelFile(path) as xl:
+            info = [(name, None, None) for name in xl.sheet_names]
+    _EXCEL_META_CACHE[key] = info
+    return info
+
+
+def excel_column_index(letters):
+    # 1-indexed column number of an Excel column name, e.g. "A" -> 1, "AB" -> 28
+    index = 0
+    for char in letters.strip().upper():
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index
+
+
+def read_excel_range(path, sheetName=None, rowRange=None, columnRange=None):
+    # only the requested block of one sheet is materialized: xlsx/xlsm rows are streamed from the 
+    # read-only workbook straight into a preallocated array, other formats go through pandas
+    row_start, row_end = [int(i) for i in rowRange.split(":")]
+    col_start, col_end = [excel_column_index(c) for c in columnRange.split(":")]
+    sheets = excel_sheet_info(path)
+    if sheetName in [None, ""]:
+        sheetName = sheets[0][0]
+    if sheetName not in [name for name, _, _ in sheets]:
+        raise ValueError(f'Sheet "{sheetName}" not found in "{path}"')
+    
+    if path.split('.')[-1] not in ['xlsx', 'xlsm']:
+        import pandas as pd
+        data = pd.read_excel(path, sheet_name=sheetName, header=None, skiprows=row_start - 1, 
+                             nrows=row_end - row_start + 1, usecols=columnRange.upper())
+        return data.to_numpy(dtype=np.float64)
+    
+    import openpyxl
+    _, max_row, _ = sheets[[name for name, _, _ in sheets].index(sheetName)]
+    if max_row is not None:
+        row_end = min(row_end, max_row)
+    data = np.full((max(row_end - row_start + 1, 0), col_end - col_start + 1), np.nan)
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheetName].iter_rows(min_row=row_start, max_row=row_end, min_col=col_start, 
+                                       max_col=col_end, values_only=True)
+        n_rows = 0
+        for i, row in enumerate(rows):
+            try:
+                data[i, :len(row)] = [np.nan if v is None else v for v in row]
+            except (TypeError, ValueError):
+                raise ValueError(f'Non-numeric cell in row {row_start + i} of sheet "{sheetName}"')
+            n_rows = i + 1
+    finally:
+        wb.close()
+    return data[:n_rows]
+
+
+def sniff_columnar(path):
+    extension = path.split('.')[-1]
+    if extension in PARQUET_EXTENSIONS:
+        import pyarrow.parquet as pq
+        meta = pq.read_metadata(path)
+        return {'summary': f'{meta.num_rows} rows x {meta.num_columns} columns ({meta.num_row_groups} row groups)', 
+                'shape': (meta.num_rows, meta.num_columns)}
+    if extension in FEATHER_EXTENSIONS:
+        import pyarrow as pa
+        import pyarrow.ipc
+        with pa.memory_map(path, 'r') as source:
+            reader = pa.ipc.open_file(source)
+            n_rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+            return {'summary': f'{n_rows} rows x {len(reader.schema.names)} columns', 
+                    'shape': (n_rows, len(reader.schema.names))}
+    import h5py
+    with h5py.File(path, 'r') as f:
+        name = hdf5_dataset_name(f)
+        dims = ' x '.join(str(n) for n in f[name].shape)
+        return {'summary': f'dataset "{name}": {dims}', 'shape': f[name].shape}
+
+
+def sniff_data_file(path):
+    # quick preview of a training data file: only headers, metadata or the first few KB are read
+    extension = path.split('.')[-1]
+    if extension == 'npy':
+        return sniff_npy(path)
+    if extension in EXCEL_EXTENSIONS:
+        sheets = excel_sheet_info(path)
+        summary = ', '.join(name if n_rows is None else f'{name} ({n_rows} x {n_cols})' 
+                            for name, n_rows, n_cols in sheets)
+        return {'summary': f'sheets: {summary}'}
+    if extension in COLUMNAR_EXTENSIONS:
+        return sniff_columnar(path)
+    return sniff_text(path)
+
+
+def row_hashes(block, multipliers):
+    # 64-bit hash of every row of a float64 block (uint64 arithmetic wraps around)
+    bits = (block + 0.0).view(np.uint64) # + 0.0 folds -0.0 into 0.0
+    h = (bits * multipliers).sum(axis=1, dtype=np.uint64)
+    h ^= h >> np.uint64(31)
+    h *= np.uint64(0x9E3779B97F4A7C15)
+    return h ^ (h >> np.uint64(29))
+
+
+def audit_training_data(data, chunk_rows=AUDIT_CHUNK_ROWS):
+    # one chunked pass over the samples (rows): per-column finite counts, min/max and variance, plus 
+    # row hashes; rows sharing a hash are then compared exactly to count duplicate samples
+    t0 = time.perf_counter()
+    n_rows, n_cols = data.shape
+    finite = np.zeros(n_cols, dtype=np.int64)
+    col_min = np.full(n_cols, np.inf)
+    col_max = np.full(n_cols, -np.inf)
+    shift = None
+    col_sum = np.zeros(n_cols)
+    col_sumsq = np.zeros(n_cols)
+    hashes = np.empty(n_rows, dtype=np.uint64)
+    multipliers = np.random.default_rng(0).integers(1, 2**63, n_cols, dtype=np.uint64) | np.uint64(1)
+    
+    with np.errstate(over='ignore', invalid='ignore'):
+        for start in range(0, n_rows, chunk_rows):
+            block = np.asarray(data[start:start+chunk_rows], dtype=np.float64)
+            mask = np.isfinite(block)
+            values = np.where(mask, block, 0.0)
+            if shift is None:
+                # shifted sums keep the variance accurate for columns with a large mean
+                shift = np.where(mask.any(axis=0), values.sum(axis=0) / np.maximum(mask.sum(axis=0), 1), 0.0)
+            finite += mask.sum(axis=0)
+            col_min = np.minimum(col_min, np.where(mask, block, np.inf).min(axis=0))
+            col_max = np.maximum(col_max, np.where(mask, block, -np.inf).max(axis=0))
+            centered = np.where(mask, block - shift, 0.0)
+            col_sum += centered.sum(axis=0)
+            col_sumsq += (centered * centered).sum(axis=0)
+            hashes[start:start+len(block)] = row_hashes(block, multipliers)
+    
+    n_finite = np.maximum(finite, 1)
+    variance = np.maximum(col_sumsq / n_finite - (col_sum / n_finite)**2, 0.0)
+    variance[finite == 0] = np.nan
+    
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    same = sorted_hashes[1:] == sorted_hashes[:-1]
+    candidates = np.unique(np.concatenate([order[1:][same], order[:-1][same]])) if same.any() else []
+    duplicates = 0
+    if len(candidates) > 0:
+        rows = np.asarray(data[candidates], dtype=np.float64) + 0.0
+        duplicates = len(candidates) - len(np.unique(rows, axis=0))
+    
+    constant = np.flatnonzero((finite > 0) & (col_max == col_min))
+    return {
+        'n_samples': n_rows,
+        'n_features': n_cols,
+        'finite': finite,
+        'min': col_min,
+        'max': col_max,
+        'variance': variance,
+        'non_finite_cells': int(n_rows * n_cols - finite.sum()),
+        'non_finite_columns': np.flatnonzero(finite < n_rows),
+        'constant_columns': constant,
+        'duplicate_rows': int(duplicates),
+        'runtime': time.perf_counter() - t0,
+        }
+
+
+def audit_findings(report):
+    # (errors, warnings) as printable lines
+    def listed(idx, limit=10):
+        idx = [str(i) for i in idx]
+        return ', '.join(idx[:limit]) + (f', ... ({len(idx)} total)' if len(idx) > limit else '')
+    errors = []
+    warnings = []
+    if report['non_finite_cells'] > 0:
+        errors.append(f"{report['non_finite_cells']} NaN/inf cells in column(s) {listed(report['non_finite_columns'])}")
+    if len(report['constant_columns']) > 0:
+        errors.append(f"constant column(s) {listed(report['constant_columns'])} (zero variance)")
+    if report['duplicate_rows'] > 0:
+        errors.append(f"{report['duplicate_rows']} duplicate sample(s) (zero distances in the DMAPS kernel)")
+    if report['n_samples'] <= report['n_features']:
+        warnings.append(f"fewer samples ({report['n_samples']}) than features ({report['n_features']})")
+    return errors, warnings
+
+
+def save_audit_report(path, report):
+    # per-column statistics as csv
+    table = np.column_stack([np.arange(report['n_features']), report['finite'], report['min'], 
+                             report['max'], report['variance']])
+    np.savetxt(path, table, delimiter=',', fmt=['%d', '%d', '%.9g', '%.9g', '%.9g'], 
+               header='column,finite,min,max,variance', comments='')
+
+
+def data_cache_key(path, options):
+    # identifies a parsed dataset: source file identity (path, size, mtime) and every option that shapes the array
+    st = os.stat(path)
+    ident = {'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 
+             'options': options}
+    return hashlib.sha256(json.dumps(ident, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def data_cache_load(key, cache_dir=DATA_CACHE_DIR):
+    entry = os.path.join(cache_dir, f'{key}.npy')
+    try:
+        data = np.load(entry, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    os.utime(entry) # mtime doubles as last-use time for LRU eviction
+    return data
+
+
+def data_cache_store(key, data, budget_bytes, cache_dir=DATA_CACHE_DIR):
+    # write the parsed array, then evict least recently used entries until the cache fits the budget
+    if data.nbytes > budget_bytes:
+        return False
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = os.path.join(cache_dir, f'{key}.npy')
+    tmp = os.path.join(cache_dir, f'{key}.{os.getpid()}.tmp.npy')
+    np.save(tmp, data)
+    os.replace(tmp, entry) # atomic: concurrent readers never see a partial entry
+    data_cache_evict(budget_bytes, cache_dir, keep=entry)
+    return True
+
+
+def data_cache_evict(budget_bytes, cache_dir=DATA_CACHE_DIR, keep=None, suffix='.npy'):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(suffix) and '.tmp.' not in name:
+            full = os.path.join(cache_dir, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, full))
+    total = sum(size for _, size, _ in entries)
+    for _, size, full in sorted(entries):
+        if total <= budget_bytes:
+            break
+        if full == keep:
+            continue
+        try:
+            os.remove(full) # jobs hold hardlinks or copies of entries, never symlinks, so this is safe
+        except OSError:
+            continue
+        total -= size
+
+
+def cache_budget_bytes(plom_gui_input):
+    # "Data cache (GB)" option; 0 or an invalid value disables the cache
+    try:
+        return max(0, int(float(plom_gui_input.get('job_dataCacheGB', '0')) * 1e9))
+    except ValueError:
+        return 0
+
+
+def training_data_key(plom_gui_input):
+    # identifies the training array a job ingests: source file identity and every option that shapes it
+    inputs = plom_gui_input
+    options = [inputs[key] for key in ['data_delimiter', 'data_sheetName', 'data_hasLabels', 'data_rowRange', 
+                                       'data_hasIndices', 'data_columnRange', 'data_columnsAre', 
+                                       'data_rowIgnore', 'data_colIgnore']]
+    return data_cache_key(inputs['data_path'], options + [np.dtype(precision_dtype(inputs)).name])
+
+
+def load_training_data(
+    path, delimiter=None, sheetName=0, hasLabels=False, rowRange=None, 
+    hasIndices=None, columnRange=None, columnsAre='features', rowIgnore=[],
+    colIgnore=[], dtype=np.float64):
+    
+    data = None
+    
+    try:
+        file_extension = path.split('.')[-1]
+        selection_done = False
+        
+        if file_extension in EXCEL_EXTENSIONS:
+            data = read_excel_range(path, sheetName, rowRange, columnRange)
+        
+        elif file_extension in PARQUET_EXTENSIONS:
+            data = read_parquet(path, rowIgnore, colIgnore, hasIndices, columnsAre, dtype)
+            selection_done = True
+        
+        elif file_extension in FEATHER_EXTENSIONS:
+            data = read_feather(path, rowIgnore, colIgnore, hasIndices, columnsAre, dtype)
+            selection_done = True
+        
+        elif file_extension in HDF5_EXTENSIONS:
+            data = read_hdf5(path, sheetName, rowIgnore, colIgnore, hasIndices, columnsAre, dtype=dtype)
+            selection_done = True
+        
+        elif file_extension == "npy":
+            data = np.load(path, mmap_mode='r') # pages are read on demand, selections below stay views when possible
+        
+        else: # csv, txt, dat, or other
+            delimiter = parse_delimiter(delimiter, file_extension)
+            skip_header = int(hasLabels) # ignore first line
+            try:
+                data = read_delimited(path, delimiter, skip_header, rowIgnore, 
+                                      colIgnore, hasIndices, columnsAre, dtype=dtype)
+                selection_done = True # selection pushed down into the reader
+            except ValueError:
+                print("Fast parser failed (non-numeric or ragged fields), falling back to np.genfromtxt")
+                data = np.genfromtxt(path, delimiter=delimiter, 
+                                     skip_header=skip_header)
+        
+        if not selection_done:
+            plan = selection_plan(data.shape[0], data.shape[1], rowIgnore, 
+                                  colIgnore, hasIndices, columnsAre)
+            data = apply_selection_plan(np.asanyarray(data), plan)
+        
+        if data.dtype != dtype:
+            data = data.astype(dtype) # values are parsed in float64, storage follows the precision option
+    
+    except ImportError as e:
+        print(f'Reading ".{file_extension}" files requires the optional package "{e.name}"')
+        data = None
+    except Exception as e:
+        print(f'Unable to load training data: {e}')
+        data = None
+    
+    return data
+
+
+class JobContext:
+    # absolute paths of a job's files. Jobs never change the working directory: it is shared by every 
+    # thread of the process, so jobs running side by side in one process would redirect each other.
+    def __init__(self, job_path, job_name, training_fname='training.txt'):
+        self.name = job_name
+        self.path = os.path.abspath(os.path.join(job_path, job_name))
+        self.output = os.path.join(self.path, 'output')
+        self.training = self.file(training_fname)
+        self.deck = self.file('input.txt')
+        self.session = self.file('session.txt')
+        self.samples = os.path.join(self.output, 'samples')
+        self.summary = os.path.join(self.output, 'summary.txt')
+        # PLoM writes its summary to "<job_desc>_plom_summary.txt": an absolute job_desc puts it in the 
+        # job's output directory instead of the working directory, where same-named jobs would collide
+        self.job_desc = os.path.join(self.output, job_name)
+    
+    @classmethod
+    def for_inputs(cls, plom_gui_input):
+        return cls(plom_gui_input['job_path'], plom_gui_input['job_name'], training_fname_for(plom_gui_input))
+    
+    def file(self, name):
+        return os.path.join(self.path, name)
+    
+    def deck_path(self, path):
+        # PLoM splits deck lines on whitespace: a path containing any is written relative to the job 
+        # directory and resolved after parsing
+        return os.path.relpath(path, self.path) if any(c.isspace() for c in path) else path
+    
+    def resolve(self, args):
+        # absolute paths for the plom arguments parsed from a deck, whose paths may be relative to the 
+        # job directory (decks written before job contexts, by hand, or for paths with whitespace)
+        for key in ['training', 'samples_fname']:
+            value = args.get(key)
+            if isinstance(value, str) and value not in ['', 'None'] and not os.path.isabs(value):
+                args[key] = self.file(value)
+        args['job_desc'] = self.job_desc
+        return args
+    
+    def place_summary(self):
+        # move the summary PLoM wrote next to job_desc to output/summary.txt; False if there is none
+        try:
+            os.replace(f'{self.job_desc}_plom_summary.txt', self.summary)
+            return True
+        except OSError:
+            return False
+
+
+def make_input_deck(plom_gui_input, training_fname='training.txt'):
+    
+    inputs = plom_gui_input
+    context = JobContext(inputs['job_path'], inputs['job_name'], training_fname)
+    
+    scaling_yesNo = "True" if inputs['scaling_yesNo'].strip() == "Yes" else "False"
+    scaling_method = inputs['scaling_method']
+    
+    pca_yesNo = "True" if inputs['pca_yesNo'].strip() == "Yes" else "False"
+    pca_method = inputs['pca_method']
+    pca_criteria = inputs['pca_criteria']
+    pca_scaleEvecs = "True" if inputs['pca_scaleEvecs'].strip() == "Yes" else "False"
+    
+    dmaps_yesNo = "True" if inputs['dmaps_yesNo'].strip() == "Yes" else "False"
+    dmaps_epsilon = inputs['dmaps_epsilon']
+    dmaps_kappa = inputs['dmaps_kappa']
+    dmaps_L = inputs['dmaps_L']
+    dmaps_firstEigvec = inputs['dmaps_firstEigvec']
+    dmaps_dim = inputs['dmaps_dim']
+    
+    projection_yesNo = "True" if inputs['projection_yesNo'].strip() == "Yes" else "False"
+    projection_source = inputs['projection_source']
+    projection_target = inputs['projection_target']
+    
+    sampling_yesNo = "True" if inputs['sampling_yesNo'].strip() == "Yes" else "False"
+    sampling_NSamples = inputs['sampling_NSamples']
+    sampling_f0 = inputs['sampling_f0']
+    sampling_dr = inputs['sampling_dr']
+    sampling_itoSteps = inputs['sampling_itoSteps']
+    sampling_potMethod = inputs['sampling_potMethod']
+    sampling_kdeBW = inputs['sampling_kdeBW']
+    sampling_saveSamples = "True" if inputs['sampling_saveSamples'].strip() == "Yes" else "False"
+    if precision_dtype(inputs) != np.float64 or inputs.get('sampling_toFile', 'No').strip() == "Yes":
+        sampling_saveSamples = "False" # samples are written by run_job at the selected precision
+    sampling_samplesFType = inputs['sampling_samplesFType']
+    sampling_parallel = "True" if  inputs['sampling_parallel'].strip() == "Yes" else "False"
+    sampling_njobs = inputs['sampling_njobs']
+    if sampling_njobs.strip() == "auto":
+        # PLoM reads an integer; run_job sets the worker count from the data size when the job starts
+        sampling_njobs = f'{available_cores()} # auto'
+    
+    
+    job_name = inputs['job_name']
+
+    
+    if pca_method == "Cumulative Energy":
+        pca_method = "cum_energy"
+        pca_criteriaName = "pca_cum_energy    "
+    elif pca_method == "Eigenvalue Cutoff":
+        pca_method = "eigv_cutoff"
+        pca_criteriaName = "pca_eigv_cutoff "
+    elif pca_method == "PCA Dimension":
+        pca_method = "pca_dim"
+        pca_criteriaName = "pca_dim         "
+    
+    if dmaps_epsilon == "0":
+        dmaps_epsilon = "auto"
+    
+    if projection_source == "PCA space":
+        projection_source = "pca"
+    elif projection_source == "Scaled space":
+        projection_source = "scaling"
+    elif projection_source == "Original space":
+        projection_source = "data"
+    
+    if projection_target == "PCA space":
+        projection_target = "pca"
+    elif projection_target == "DMAPs space":
+        projection_target = "dmaps"
+    
+    if sampling_itoSteps == "0":
+        sampling_itoSteps = "auto"
+    
+    os.makedirs(context.output, exist_ok=True)
+    
+    lines = [
+     '# this is an input file for PLoM;\n',
+     "# lines starting with '#' or '*' are ignored;\n",
+     "# leading ' ', '\\t', '\\n' are ignored;\n",
+     '# option and value should be separated by whitespace(s) or TAB(s);\n',
+     "# inline comments begin with '#'\n",
+     '#########################################################################\n',
+     '\n',
+     '\n',
+     
+     '*** PATH OF TRAINING (INPUT) DATA ***\n',
+     f'training           {context.deck_path(context.training)}\n',
+     '\n',
+     '\n',
+     
+     '*** SCALING PARAMETERS ***\n',
+     f'scaling            {scaling_yesNo}\n',
+     f'scaling_method     {scaling_method}\n',
+     '\n',
+     '\n',
+     
+     '*** PCA PARAMETERS ***\n',
+     f'pca                {pca_yesNo}\n',
+     f'pca_scale_evecs    {pca_scaleEvecs}\n',
+     f'pca_method         {pca_method}\n',
+     f'{pca_criteriaName} {pca_criteria}\n',
+     '\n',
+     '\n',
+     
+     '*** DMAPS PARAMETERS ***\n',
+     f'dmaps              {dmaps_yesNo}\n',
+     f'dmaps_epsilon      {dmaps_epsilon} # <float> or auto\n',
+     f'dmaps_kappa        {dmaps_kappa}\n',
+     f'dmaps_L            {dmaps_L}\n',
+     f'dmaps_first_evec   {dmaps_firstEigvec}\n',
+     f'dmaps_m_override   {dmaps_dim}\n',
+     'dmaps_dist_method  standard\n',
+     '\n',
+     '\n',
+     
+     '*** SAMPLING PARAMETERS ***\n',
+     f'sampling           {sampling_yesNo}\n',
+     f'num_samples        {sampling_NSamples}\n',
+     f'parallel           {sampling_parallel}\n',
+     f'n_jobs             {sampling_njobs}\n',
+     f'save_samples       {sampling_saveSamples}\n',
+     f'samples_fname      {context.deck_path(context.samples)} # if None, file will be named using job_desc and save time\n',
+     f'samples_fmt        {sampling_samplesFType} # npy or txt\n',
+     '\n',
+     '\n',
+     
+     '*** ITO PARAMETERS ***\n',
+     f'projection         {projection_yesNo}\n',
+     f'projection_source  {projection_source} # pca, scaling, or data\n',
+     f'projection_target  {projection_target} # dmaps or pca\n',
+     f'ito_f0             {sampling_f0}\n',
+     f'ito_dr             {sampling_dr}\n',
+     f'ito_steps          {sampling_itoSteps} # <int> or auto\n',
+     f'ito_pot_method     {sampling_potMethod}\n',
+     f'ito_kde_bw_factor  {sampling_kdeBW}\n',
+    
+     '\n',
+     '\n',
+     '*** JOB PARAMETERS ***\n',
+     f'job_desc           {job_name}\n',
+     'verbose            True\n'
+     ]
+    
+    with open(context.deck, 'w') as f:
+        f.writelines(lines)
+
+
+def write_session(file_path, plom_gui_input):
+    with open(file_path, 'w') as f:
+        for key, value in plom_gui_input.items():
+            f.write(f"{key.ljust(25)}: {value}\n")
+
+
+SESSION_FLAGS = ['data_hasLabels', 'data_hasIndices'] # checkbox options, saved by the GUI as 0 or 1
+
+
+def session_flags(plom_gui_input):
+    # checkbox options read back from a session file (or set on the command line) as 0 or 1: the strings 
+    # "0" and "False" would otherwise count as true
+    for key in SESSION_FLAGS:
+        if key in plom_gui_input:
+            plom_gui_input[key] = int(str(plom_gui_input[key]).strip() not in ['', '0', 'False', 'No'])
+    return plom_gui_input
+
+
+def read_session(file_path):
+    inputs = dict()
+    with open(file_path, 'r') as f:
+        for line in f:
+            key, value = line.replace('\n', '').split(": ", 1)
+            inputs[key.strip()] = value
+    return session_flags(inputs)
+
+
+def create_job(plom_gui_input, profiler=None):
+    # profiler: JobProfiler of the run_job call creating the job; a job created on its own is profiled here
+    inputs = plom_gui_input
+    own_profile = profiler is None
+    if own_profile:
+        profiler = JobProfiler()
+    
+    context = JobContext.for_inputs(inputs)
+    job_path_full = context.path
+    os.makedirs(context.output, exist_ok=True)
+    
+    write_session(context.session, inputs)
+    print(f"Session saved to {context.session}\n")
+    
+    profiler.start('ingest')
+    path = inputs['data_path']
+    delimiter = inputs['data_delimiter']
+    sheetName = inputs['data_sheetName']
+    hasLabels = inputs['data_hasLabels']
+    rowRange = inputs['data_rowRange']
+    hasIndices = inputs['data_hasIndices']
+    columnRange = inputs['data_columnRange']
+    columnsAre = inputs['data_columnsAre']
+    rowIgnore = inputs['data_rowIgnore']
+    colIgnore = inputs['data_colIgnore']
+    
+    dtype = precision_dtype(inputs)
+    training_data = None
+    cache_key = None
+    cache_budget = cache_budget_bytes(inputs)
+    data_cached = False
+    if cache_budget > 0 and path.split('.')[-1] != 'npy' and os.path.isfile(path):
+        # .npy sources are memory-mapped directly, everything else is parsed once and reused
+        cache_key = training_data_key(inputs)
+        training_data = data_cache_load(cache_key)
+        if training_data is not None:
+            data_cached = True
+            print(f'Training data loaded from cache (source unchanged, parsing skipped): "{training_data.filename}"')
+    
+    if training_data is None:
+        training_data = load_training_data(
+            path, delimiter, sheetName, hasLabels, rowRange, 
+            hasIndices, columnRange, columnsAre, rowIgnore, colIgnore, dtype)
+    
+    if training_data is None:
+        profiler.stop('ingest')
+        print("Failed to load training data. Job not created.")
+        return False
+    
+    if cache_key is not None and not data_cached:
+        try:
+            if data_cache_store(cache_key, training_data, cache_budget):
+                print(f'Training data cached: "{DATA_CACHE_DIR}"')
+        except OSError as e:
+            print(f'Training data not cached: {e}')
+    
+    print(f"Training data loaded: {training_data.shape[0]} samples, {training_data.shape[1]} features ({training_data.dtype})")
+    profiler.stop('ingest')
+    profiler.data_shape = training_data.shape
+    
+    if not check_job_estimate(inputs, training_data.shape):
+        print("Job not created.\n")
+        return False
+    
+    audit_mode = inputs['job_audit'].strip()
+    if audit_mode != "Off":
+        profiler.start('audit')
+        report = audit_training_data(training_data)
+        save_audit_report(f"{job_path_full}/output/data_audit.csv", report)
+        errors, warnings = audit_findings(report)
+        for line in errors:
+            print(f"    Data audit {'error' if audit_mode == 'Block on errors' else 'warning'}: {line}")
+        for line in warnings:
+            print(f"    Data audit warning: {line}")
+        print(f"Data audit completed in {report['runtime']:.3f} s "
+              f"({len(errors)} error(s), {len(warnings)} warning(s)): \"{job_path_full}/output/data_audit.csv\"")
+        profiler.stop('audit')
+        if errors and audit_mode == "Block on errors":
+            print("Training data failed the audit. Job not created.\n")
+            return False
+    
+    profiler.start('training write')
+    training_fname = training_fname_for(inputs)
+    data_format = training_fname.split('.')[-1]
+    if data_format == 'npy' and is_whole_npy_memmap(training_data):
+        # source .npy used as is: link it into the job instead of writing a second copy
+        link_method = link_file(training_data.filename, context.training, 
+                                allow_symlink=not data_cached) # cache entries may be evicted
+        print(f'Training data linked ({link_method}): "{context.training}"')
+    else:
+        save_training_file(context.training, training_data, data_format)
+        print(f'Training data saved: "{context.training}"')
+    
+    if inputs['job_saveText'].strip() == "Yes" and data_format != 'txt':
+        np.savetxt(context.file('training.txt'), training_data, fmt=text_fmt(training_data))
+        print(f'Training data text copy saved: "{context.file("training.txt")}"')
+    print()
+    profiler.stop('training write')
+    
+    profiler.start('deck write')
+    make_input_deck(inputs, training_fname)
+    profiler.stop('deck write')
+    print("Input deck created")
+    print(f'Input deck saved: "{context.deck}"\n')
+    print('Job created successfully\n')
+    if own_profile:
+        profiler.save(job_path_full, inputs)
+    return True
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobTimedOut(JobCancelled):
+    pass
+
+
+def write_job_status(job_path_full, status):
+    # output/status.json tells whether the job directory holds a finished job: running, completed, 
+    # failed, cancelled or timed out
+    output_dir = f'{job_path_full}/output'
+    if not os.path.isdir(output_dir):
+        return
+    tmp = f'{output_dir}/status.json.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'status': status, 'time': time.strftime('%Y-%m-%d %H:%M:%S')}, f)
+    os.replace(tmp, f'{output_dir}/status.json')
+
+
+def mark_job_stopped(job_path_full, status):
+    # job stopped from outside (cancel, timeout): drop partial writes, record why it stopped
+    output_dir = f'{job_path_full}/output'
+    if os.path.isdir(output_dir):
+        for name in os.listdir(output_dir):
+            if name.endswith('.tmp'):
+                try:
+                    os.remove(f'{output_dir}/{name}')
+                except OSError:
+                    pass
+    write_job_status(job_path_full, status)
+
+
+def job_timeout_seconds(plom_gui_input):
+    # "Timeout (min)" option; 0 or an invalid value means no timeout
+    try:
+        return max(0.0, float(plom_gui_input.get('job_timeoutMin', '0')) * 60)
+    except ValueError:
+        return 0.0
+
+
+def check_cancelled():
+    # cooperative cancellation point for jobs run in a thread (see run_job)
+    cancel = getattr(_stage_context, 'cancel', None)
+    if cancel is not None and cancel.is_set():
+        raise JobCancelled()
+
+
+def run_job(plom_gui_input, prepared=False, shared_training=None, cancel=None, progress=None, core_limit=None):
+    # prepared: the job directory (training data and input deck) was already created, e.g. by a sweep
+    # shared_training: path of the queue's shared segment for this job's training data (see below)
+    # cancel: threading.Event checked between PLoM stages; job processes are terminated instead
+    # progress: callable receiving every progress event of the job (see ProgressReporter)
+    # core_limit: cores the job queue allotted to the job, an upper bound for "auto" sampling workers
+    inputs = plom_gui_input
+    
+    context = JobContext.for_inputs(inputs)
+    job_path_full = context.path
+    
+    os.makedirs(context.output, exist_ok=True)
+    reporter = ProgressReporter(job_path_full, progress, total_samples(inputs))
+    reporter.stage_start('load')
+    profiler = JobProfiler()
+    
+    if not prepared and not create_job(plom_gui_input, profiler):
+        write_job_status(job_path_full, 'failed')
+        return False
+    
+    save_results_dict  = True if inputs['results_dict'].strip() == "Yes" else False
+    save_results_plots = True if inputs['results_plots'].strip() == "Yes" else False
+    
+    write_job_status(job_path_full, 'running')
+    
+    if not os.path.exists(context.deck):
+        print('Job input deck not found\n')
+        write_job_status(job_path_full, 'failed')
+        return False
+    
+    profiler.start('parse')
+    try:
+        args = context.resolve(parse_input(context.deck))
+    except:
+        print('Unable to parse job input deck\n')
+        write_job_status(job_path_full, 'failed')
+        return False
+    
+    if shared_training is not None:
+        args['training'] = attach_shared_training(shared_training, context.training)
+        print(f'Training data attached from shared segment: "{shared_training}"')
+    elif not isinstance(args.get('training'), np.ndarray):
+        # copy-on-write memory map: jobs sharing one linked training file share its pages
+        args['training'] = load_training_file(context.training, mmap_mode='c')
+    # reduced precision is a storage format: PLoM computes in float64
+    args['training'] = np.asarray(args['training'], dtype=np.float64)
+    reporter.stage_end('load', samples=args['training'].shape[0], features=args['training'].shape[1])
+    profiler.stop('parse')
+    profiler.data_shape = args['training'].shape
+    
+    if (inputs['sampling_yesNo'].strip() == "Yes" and inputs['sampling_parallel'].strip() == "Yes" 
+            and inputs['sampling_njobs'].strip() == "auto"):
+        n_jobs, reasons = auto_n_jobs(*args['training'].shape, total_samples(inputs), core_limit)
+        args['n_jobs'] = profiler.n_jobs = n_jobs
+        print(f'Sampling workers (auto): {n_jobs}')
+        for line in reasons:
+            print(f'    {line}')
+        print()
+    elif inputs['sampling_yesNo'].strip() == "Yes" and inputs['sampling_parallel'].strip() == "Yes":
+        # a prepared deck (a sweep point) keeps the n_jobs of the session it was written from: the worker 
+        # count the job queue allotted is in the inputs
+        try:
+            args['n_jobs'] = int(inputs['sampling_njobs'])
+        except ValueError:
+            pass
+    
+    install_stage_hooks() # stage boundaries are the cancellation points of thread jobs
+    dmaps_kernel = open_dmaps_kernel(inputs, args, context.output, core_limit)
+    sample_sink = open_sample_sink(inputs, context.output)
+    
+    stage_cache = None
+    if inputs.get('job_stageCache', 'No').strip() == "Yes" and cache_budget_bytes(inputs) > 0:
+        # the kernel is not a deck option: it enters the DMAPS cache key separately
+        cache_args = dict(args)
+        if dmaps_kernel is not None and dmaps_kernel['kernel'] == "Sparse kNN":
+            cache_args.update(dmaps_kernel='sparse knn', dmaps_neighbors=dmaps_kernel['neighbors'])
+        elif dmaps_kernel is not None:
+            cache_args.update(dmaps_kernel='dense blocked', dmaps_blockPrecision=np.dtype(dmaps_kernel['dtype']).name)
+        stage_cache = open_stage_cache(args['training'], cache_args, cache_budget_bytes(inputs))
+    
+    print("\n\n*** JOB STARTING ***\n\n")
+    t0 = time.perf_counter()
+    _stage_context.cache = stage_cache
+    _stage_context.cancel = cancel
+    _stage_context.progress = reporter
+    _stage_context.profiler = profiler
+    _stage_context.dmaps = dmaps_kernel
+    try:
+        check_cancelled()
+        profiler.start('initialize')
+        solution_dict = initialize(**args)
+        profiler.stop('initialize')
+        profiler.start('run')
+        run(solution_dict)
+        profiler.stop('run')
+        check_cancelled()
+    except JobCancelled as e:
+        timed_out = isinstance(e, JobTimedOut)
+        write_job_status(job_path_full, 'timed out' if timed_out else 'cancelled')
+        print(f"\n\n*** JOB {'TIMED OUT' if timed_out else 'CANCELLED'} ***\n\n")
+        if timed_out:
+            raise # the batch entry point reports timeouts with their own exit status
+        return False
+    except BaseException:
+        write_job_status(job_path_full, 'failed')
+        raise
+    finally:
+        _stage_context.cache = None
+        _stage_context.cancel = None
+        _stage_context.progress = None
+        _stage_context.profiler = None
+        _stage_context.dmaps = None
+    if stage_cache is not None:
+        print(f"\nStage cache hits: {', '.join(stage_cache['hits']) or 'none'}; "
+              f"computed: {', '.join(stage_cache['computed']) or 'none'}")
+    with open(f'{job_path_full}/output/timing.json', 'w') as f:
+        json.dump({'wall_s': time.perf_counter() - t0}, f)
+    
+    if sample_sink is not None:
+        # once PLoM is done with them: its own steps after sampling read the augmented array
+        profiler.start('samples to file')
+        samples_to_file(solution_dict, sample_sink)
+        profiler.stop('samples to file')
+    
+    dtype = precision_dtype(inputs)
+    if dtype != np.float64:
+        profiler.start('cast and save samples')
+        cast_float_arrays(solution_dict, dtype)
+        samples = solution_dict['data'].get('augmented')
+        # samples kept in a file were written at this precision by the sample sink
+        if inputs['sampling_saveSamples'].strip() == "Yes" and isinstance(samples, np.ndarray):
+            samples_fmt = inputs['sampling_samplesFType'].strip()
+            samples_path = f'{job_path_full}/output/samples.{samples_fmt}'
+            save_samples_file(samples_path, samples, samples_fmt)
+            print(f'\n\nSamples saved ({samples.dtype}): "{samples_path}"\n')
+        profiler.stop('cast and save samples')
+    
+    if save_results_dict:
+        profiler.start('save_dict')
+        dict_path = f'{job_path_full}/output/result.dict'
+        save_dict(solution_dict, f'{dict_path}.tmp')
+        os.replace(f'{dict_path}.tmp', dict_path) # a stopped job never leaves a partial result.dict
+        profiler.stop('save_dict')
+        print(f'\n\nResults dictionary saved: "{dict_path}"\n')
+    
+    if save_results_plots:
+        plots_path = f'{job_path_full}/output/plots.pdf'
+        # make_analysis_plot(solution_dict, plots_path)
+        pass
+    
+    profiler.start('summary')
+    if not context.place_summary():
+        map_samples(solution_dict, context.output) # the summary reads the samples as an array
+        save_summary(solution_dict, context.summary)
+    profiler.stop('summary')
+    
+    profiler.save(job_path_full, inputs)
+    write_job_status(job_path_full, 'completed')
+    print("\n\n*** JOB COMPLETED SUCCESSFULLY ***\n\n")
+    return True
+
+
+def run_input_deck(deck_path):
+    # run a PLoM input deck as is; the training file and outputs are relative to the deck's directory
+    job_path_full = os.path.dirname(os.path.abspath(deck_path))
+    try:
+        args = parse_input(deck_path)
+    except:
+        print('Unable to parse job input deck\n')
+        return False
+    context = JobContext(os.path.dirname(job_path_full), os.path.basename(job_path_full))
+    os.makedirs(context.output, exist_ok=True)
+    context.resolve(args)
+    
+    if not isinstance(args.get('training'), np.ndarray):
+        if not args.get('training') or not os.path.isfile(str(args['training'])):
+            print(f"Training data not found: \"{args.get('training')}\"\n")
+            return False
+        args['training'] = load_training_file(str(args['training']), mmap_mode='c')
+    args['training'] = np.asarray(args['training'], dtype=np.float64)
+    
+    print("\n\n*** JOB STARTING ***\n\n")
+    t0 = time.perf_counter()
+    solution_dict = initialize(**args)
+    run(solution_dict)
+    with open(f'{job_path_full}/output/timing.json', 'w') as f:
+        json.dump({'wall_s': time.perf_counter() - t0}, f)
+    
+    dict_path = f'{job_path_full}/output/result.dict'
+    save_dict(solution_dict, dict_path)
+    print(f'\n\nResults dictionary saved: "{dict_path}"\n')
+    if not context.place_summary():
+        save_summary(solution_dict, context.summary)
+    
+    print("\n\n*** JOB COMPLETED SUCCESSFULLY ***\n\n")
+    return True
+
+
+class QueueWriter:
+    # stdout/stderr of a job process: every write is forwarded to the GUI as a log event
+    def __init__(self, events):
+        self.events = events
+    
+    def write(self, message):
+        if message:
+            self.events.put(('log', message))
+    
+    def flush(self):
+        pass
+
+
+class ThreadOutputRouter:
+    # sys.stdout of a process running jobs in threads: writes of a thread registered with 
+    # route_thread_output go to its sink, everything else to the stream the router replaced
+    def __init__(self, stream):
+        self.stream = stream
+        self.sinks = {} # thread ident -> sink
+    
+    def write(self, message):
+        self.sinks.get(threading.get_ident(), self.stream).write(message)
+    
+    def flush(self):
+        self.sinks.get(threading.get_ident(), self.stream).flush()
+
+
+def route_thread_output(sink):
+    # stdout of the calling thread goes to sink until unroute_thread_output
+    if not isinstance(sys.stdout, ThreadOutputRouter):
+        sys.stdout = ThreadOutputRouter(sys.stdout)
+    sys.stdout.sinks[threading.get_ident()] = sink
+
+
+def unroute_thread_output():
+    if isinstance(sys.stdout, ThreadOutputRouter):
+        sys.stdout.sinks.pop(threading.get_ident(), None)
+
+
+def job_process_main(plom_gui_input, events, prepared=False, shared_training=None, core_limit=None):
+    # entry point of a spawned job process; events carries ('log', text), ('progress', event), 
+    # ('result', paths) and ('status', state)
+    if hasattr(os, 'setsid'):
+        os.setsid() # leads its own process group, so that cancelling also stops parallel sampling workers
+    sys.stdout = sys.stderr = QueueWriter(events)
+    job_path_full = f"{plom_gui_input['job_path']}/{plom_gui_input['job_name']}"
+    try:
+        completed = run_job(plom_gui_input, prepared, shared_training, 
+                            progress=lambda event: events.put(('progress', event)), core_limit=core_limit)
+    except BaseException:
+        events.put(('log', traceback.format_exc()))
+        completed = False
+    if completed:
+        dict_path = f'{job_path_full}/output/result.dict'
+        events.put(('result', {'job_path': job_path_full, 
+                               'result_dict': dict_path if os.path.isfile(dict_path) else None}))
+    # joblib keeps its sampling workers alive for reuse, and a process waits for its children before 
+    # exiting: without this the job process would linger until they idle out
+    for child in multiprocessing.active_children():
+        child.terminate()
+    events.put(('status', 'completed' if completed else 'failed'))
+
+
+def start_job_process(plom_gui_input, env=None, prepared=False, shared_training=None, core_limit=None):
+    # each job runs in its own spawned interpreter: it shares neither the GIL nor Tk state with the 
+    # GUI, and a crash or an out-of-memory kill only ends the child
+    ctx = multiprocessing.get_context('spawn')
+    events = ctx.Queue()
+    process = ctx.Process(target=job_process_main, 
+                          args=(plom_gui_input, events, prepared, shared_training, core_limit), 
+                          name=f"plom-job-{plom_gui_input['job_name']}")
+    # thread-pool sizes are read by numpy/BLAS when the child imports them, so they are set in the 
+    # environment the child is spawned with
+    saved = {key: os.environ.get(key) for key in (env or {})}
+    os.environ.update(env or {})
+    try:
+        process.start()
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    return process, events
+
+
+def terminate_job_process(process, force=False):
+    # SIGTERM (SIGKILL if force) to the job process and every worker it started; Windows only 
+    # terminates the job process itself
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+            return
+        except (ProcessLookupError, PermissionError):
+            pass # not (yet) a group leader
+    if process.is_alive():
+        process.kill() if force else process.terminate()
+
+
+#################################   BATCH ENTRY POINT   #################################
+
+def is_session_file(path):
+    try:
+        return 'data_path' in read_session(path)
+    except (ValueError, UnicodeDecodeError):
+        return False
+
+
+def main(argv=None):
+    # plom-batch: run a saved GUI session (create + run the job) or an input deck without a display.
+    # Exit status: 0 completed, 1 failed, 2 bad arguments or unreadable file, 124 timed out, 130 interrupted.
+    parser = argparse.ArgumentParser(
+        prog='plom-batch', 
+        description="Run a PLoM-GUI session file or a PLoM input deck without the GUI.")
+    parser.add_argument('file', help="session file saved by the GUI, or a PLoM input deck (input.txt)")
+    parser.add_argument('--job-path', help="override the session's job path")
+    parser.add_argument('--job-name', help="override the session's job name")
+    parser.add_argument('--create-only', action='store_true', 
+                        help="create the job directory (training data and input deck) without running it")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE', 
+                        help="override a session option, e.g. --set sampling_NSamples=50 (repeatable)")
+    options = parser.parse_args(argv)
+    
+    if not os.path.isfile(options.file):
+        print(f'File not found: "{options.file}"', file=sys.stderr)
+        return 2
+    
+    try:
+        if is_session_file(options.file):
+            inputs = {**SESSION_DEFAULTS, **read_session(options.file)}
+            if options.job_path:
+                inputs['job_path'] = os.path.abspath(options.job_path)
+            if options.job_name:
+                inputs['job_name'] = options.job_name
+            for item in options.set:
+                key, sep, value = item.partition('=')
+                if not sep or key not in inputs:
+                    print(f'Invalid option override: "{item}"', file=sys.stderr)
+                    return 2
+                inputs[key] = value
+            session_flags(inputs)
+            print(f'Session file loaded: "{options.file}"\n')
+            timeout = job_timeout_seconds(inputs)
+            if timeout > 0 and not options.create_only and hasattr(signal, 'SIGALRM'):
+                def on_timeout(signum, frame):
+                    raise JobTimedOut()
+                signal.signal(signal.SIGALRM, on_timeout)
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            completed = create_job(inputs) if options.create_only else run_job(inputs)
+        else:
+            if options.create_only or options.job_path or options.job_name or options.set:
+                print('--create-only, --job-path, --job-name and --set apply to session files only', 
+                      file=sys.stderr)
+                return 2
+            completed = run_input_deck(options.file)
+    except JobTimedOut:
+        print('\nJob timed out', file=sys.stderr)
+        return 124
+    except KeyboardInterrupt:
+        print('\nJob interrupted', file=sys.stderr)
+        return 130
+    except Exception:
+        traceback.print_exc()
+        completed = False
+    
+    if not completed:
+        print('Job failed', file=sys.stderr)
+    return 0 if completed else 1
+
+
+#################################   STAGE CACHE   #################################
+
+# Outputs of the PLoM stages before sampling are cached under a chain of keys: a stage's key hashes the 
+# key of the stage before it (the training data for the first one) and the input deck options of the 
+# stage, so a job that only changes sampling or Ito options restores them instead of recomputing.
+# run() calls the stage functions through the plom module namespace; they are wrapped in place. 
+# Everything assumed about PLoM internals is in this table: (stage, plom function, deck options).
+PLOM_STAGES = [
+    ('scaling', '_scaling', ['scaling', 'scaling_method']),
+    ('pca', '_pca', ['pca', 'pca_method', 'pca_cum_energy', 'pca_eigv_cutoff', 'pca_dim', 'pca_scale_evecs']),
+    ('dmaps', '_dmaps', ['dmaps', 'dmaps_epsilon', 'dmaps_kappa', 'dmaps_L', 'dmaps_first_evec', 
+                         'dmaps_m_override', 'dmaps_dist_method', 'dmaps_kernel', 'dmaps_neighbors', 
+                         'dmaps_blockPrecision']),
+    ('projection', '_projection', ['projection', 'projection_source', 'projection_target']),
+    ('sampling', '_sampling', None), # not cached, hooked as a cancellation point only
+    ]
+
+_stage_context = threading.local() # stage cache, cancel event, progress, profiler, sampling reporter and DMAPS kernel settings of the job running in this thread
+
+
+def array_digest(data, block_bytes=1<<26):
+    # content hash of an array, read in row blocks so that memory maps are not loaded whole
+    digest = hashlib.blake2b(f'{data.dtype.str}{data.shape}'.encode())
+    rows = max(1, block_bytes // max(1, data[:1].nbytes))
+    for start in range(0, data.shape[0], rows):
+        digest.update(np.ascontiguousarray(data[start:start + rows]).data)
+    return digest.hexdigest()
+
+
+def stage_cache_keys(data_key, args):
+    import plom
+    keys = {}
+    parent = data_key
+    for stage, _, options in PLOM_STAGES:
+        if options is None:
+            continue
+        ident = {'parent': parent, 'stage': stage, 'options': {option: args.get(option) for option in options}, 
+                 'plom': getattr(plom, '__version__', None)}
+        parent = keys[stage] = hashlib.sha256(json.dumps(ident, sort_keys=True, default=str).encode()).hexdigest()
+    return keys
+
+
+def install_stage_hooks():
+    # wrap the plom stage functions (once per process); returns the stages that can be cached
+    import plom
+    install_sample_counter()
+    basis = getattr(plom, PLOM_DMAPS_BASIS, None)
+    if callable(basis) and not hasattr(basis, 'plom_dmaps'):
+        setattr(plom, PLOM_DMAPS_BASIS, dmaps_kernel_hook(basis))
+    stages = []
+    for stage, name, options in PLOM_STAGES:
+        function = getattr(plom, name, None)
+        if not callable(function):
+            continue
+        if not hasattr(function, 'plom_stage'):
+            setattr(plom, name, cached_stage(stage, function))
+        if options is not None:
+            stages.append(stage)
+    return stages
+
+
+def open_stage_cache(training, args, budget_bytes):
+    stages = install_stage_hooks()
+    if not stages:
+        print('Stage cache unavailable: the installed plom does not expose its stage functions')
+        return None
+    return {'keys': stage_cache_keys(array_digest(training), args), 'budget': budget_bytes, 
+            'hits': [], 'computed': []}
+
+
+def cached_stage(stage, function):
+    def wrapper(solution_dict, *args, **kwargs):
+        check_cancelled()
+        reporter = getattr(_stage_context, 'progress', None)
+        profiler = getattr(_stage_context, 'profiler', None)
+        if reporter is not None:
+            reporter.stage_start(stage)
+        if profiler is not None:
+            profiler.start(f'run/{stage}')
+        if stage == 'sampling':
+            _stage_context.sampling = reporter
+        try:
+            cache = getattr(_stage_context, 'cache', None)
+            if cache is None or stage not in cache['keys']:
+                result = function(solution_dict, *args, **kwargs)
+            else:
+                result = run_cached_stage(cache, stage, function, solution_dict, *args, **kwargs)
+        finally:
+            _stage_context.sampling = None
+        if profiler is not None:
+            profiler.stop(f'run/{stage}')
+        if reporter is not None:
+            reporter.stage_end(stage, cached=cache is not None and stage in cache['hits'])
+        return result
+    wrapper.plom_stage = stage
+    return wrapper
+
+
+def solution_entries(solution_dict):
+    # identity of every first- and second-level entry of a solution dictionary
+    entries = {}
+    for key, value in solution_dict.items():
+        entries[(key,)] = id(value)
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                entries[(key, sub_key)] = id(sub_value)
+    return entries
+
+
+def run_cached_stage(cache, stage, function, solution_dict, *args, **kwargs):
+    # restore the stage outputs from the cache, or run the stage and store the entries it assigned
+    entry = os.path.join(STAGE_CACHE_DIR, f"{cache['keys'][stage]}.dict")
+    try:
+        with open(entry, 'rb') as f:
+            cached = pickle.load(f)
+        os.utime(entry)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        cached = None
+    if cached is not None:
+        for path, value in cached['entries'].items():
+            if len(path) == 1:
+                solution_dict[path[0]] = value
+            else:
+                solution_dict.setdefault(path[0], {})[path[1]] = value
+        cache['hits'].append(stage)
+        print(f'Stage cache hit: {stage} restored, not recomputed')
+        return cached['result']
+    
+    before = solution_entries(solution_dict)
+    result = function(solution_dict, *args, **kwargs)
+    entries = {}
+    for path, ident in solution_entries(solution_dict).items():
+        if before.get(path) == ident or (len(path) == 2 and (path[0],) in entries):
+            continue
+        entries[path] = solution_dict[path[0]] if len(path) == 1 else solution_dict[path[0]][path[1]]
+    cache['computed'].append(stage)
+    try:
+        os.makedirs(STAGE_CACHE_DIR, exist_ok=True)
+        tmp = os.path.join(STAGE_CACHE_DIR, f"{cache['keys'][stage]}.{os.getpid()}.tmp.dict")
+        with open(tmp, 'wb') as f:
+            pickle.dump({'entries': entries, 'result': result}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry)
+        data_cache_evict(cache['budget'], STAGE_CACHE_DIR, suffix='.dict')
+    except (OSError, pickle.PicklingError) as e:
+        print(f'Stage {stage} not cached: {e}')
+    return result
+
+
+#################################   DMAPS KERNELS   #################################
+
+# The dense DMAPS kernel holds all N x N pairs. PLoM computes the basis in the function below, called by 
+# _dmaps (possibly several times while searching epsilon); it is wrapped in place like the stage 
+# functions, and returns (basis, eigenvalues, eigenvectors) with the basis = eigenvectors * eigenvalues^kappa. 
+# Two kernels replace PLoM's own, both solving only for the leading eigenpairs of the symmetric conjugate 
+# D^-1/2 K D^-1/2 with a Lanczos solver:
+#   Sparse kNN: the n nearest neighbours of every point (KD-tree query), a truncated Gaussian 
+#     exp(-d^2 / (4 epsilon)) symmetrized by taking the larger of K_ij and K_ji: O(N n) memory.
+#   Dense (blocked): the exact dense kernel computed in square tiles, each from one matrix product 
+#     (|a|^2 + |b|^2 - 2 a.b) and an in-place exponential, with row blocks spread over a thread pool 
+#     (numpy releases the GIL in BLAS and ufuncs). The kernel is kept in memory if it fits half the 
+#     memory budget, else in a scratch file in the job's output directory if enabled, else its tiles 
+#     are recomputed for every product of the solver; the tiles of the threads get the rest.
+PLOM_DMAPS_BASIS = '_get_dmaps_basis' # (H, epsilon, kappa, ...) -> (basis, eigvals, eigvecs)
+DMAPS_KERNELS = ["Dense", "Dense (blocked)", "Sparse kNN"]
+DMAPS_SPARSE_EIGS = 20 # eigenpairs solved for first, doubled until the L drop factor is reached ...
+DMAPS_SPARSE_MAX_EIGS = 160 # ... or this many
+DMAPS_BLOCK_TILES = 2 # tile-sized arrays a thread holds at once: the kernel tile and its product
+DMAPS_SCRATCH = 'dmaps_kernel.scratch'
+
+
+def open_dmaps_kernel(plom_gui_input, args, output_path, core_limit=None):
+    # DMAPS kernel settings of a job, None for PLoM's own dense kernel
+    inputs = plom_gui_input
+    kernel = inputs.get('dmaps_kernel', 'Dense').strip()
+    if inputs['dmaps_yesNo'].strip() != "Yes" or kernel not in DMAPS_KERNELS[1:]:
+        return None
+    import plom
+    if not hasattr(getattr(plom, PLOM_DMAPS_BASIS, None), 'plom_dmaps'):
+        print(f'{kernel} DMAPS kernel unavailable: the installed plom does not expose its DMAPS basis function; '
+              'using the dense kernel')
+        return None
+    try:
+        min_eigs = int(args.get('dmaps_m_override') or 0) + 2
+    except ValueError:
+        min_eigs = 2
+    settings = {'kernel': kernel, 'L': float(args.get('dmaps_L', 0.1)), 'min_eigs': min_eigs}
+    if kernel == "Sparse kNN":
+        settings.update(neighbors=max(2, int(inputs['dmaps_neighbors'])), graph=None)
+        print(f"DMAPS kernel: sparse, {settings['neighbors']} nearest neighbours\n")
+        return settings
+    cores = available_cores()
+    settings.update(budget=int(float(inputs['dmaps_blockMB']) * 1024**2), 
+                    dtype=PRECISION_DTYPES[inputs.get('dmaps_blockPrecision', 'float64').strip()], 
+                    threads=cores if core_limit is None else max(1, min(cores, core_limit)), 
+                    scratch=f'{output_path}/{DMAPS_SCRATCH}' if inputs.get('dmaps_blockScratch', 'No').strip() == "Yes" else None)
+    print(f"DMAPS kernel: dense in tiles, {inputs['dmaps_blockMB'].strip()} MB budget, "
+          f"{np.dtype(settings['dtype']).name}, {settings['threads']} thread(s)\n")
+    return settings
+
+
+def leading_eigenpairs(S, n_points, L=0.1, min_eigs=2):
+    # leading eigenpairs of the symmetric matrix (or operator) S, in decreasing order
+    from scipy.sparse.linalg import eigsh
+    max_eigs = min(max(DMAPS_SPARSE_MAX_EIGS, min_eigs), n_points - 2)
+    n_eigs = min(max(DMAPS_SPARSE_EIGS, min_eigs), max_eigs)
+    while True:
+        eigvals, eigvecs = eigsh(S, k=n_eigs, which='LA')
+        order = np.argsort(eigvals)[::-1]
+        eigvals, eigvecs = eigvals[order], eigvecs[:, order]
+        # enough eigenpairs once the spectrum has dropped below L times the first non-trivial eigenvalue
+        if eigvals[-1] < L * eigvals[1]:
+            return eigvals, eigvecs
+        if n_eigs >= max_eigs:
+            print(f'DMAPS: the {n_eigs} leading eigenvalues stay above L times the first one; '
+                  'a larger epsilon gives a faster decaying spectrum')
+            return eigvals, eigvecs
+        n_eigs = min(2 * n_eigs, max_eigs)
+
+
+def knn_graph(H, n_neighbors):
+    # squared distances and indices of the n nearest neighbours of every row of H (itself included)
+    from scipy.spatial import cKDTree
+    t0 = time.perf_counter()
+    k = min(n_neighbors + 1, H.shape[0])
+    distances, indices = cKDTree(H).query(H, k=k, workers=-1)
+    print(f'DMAPS kNN graph: {H.shape[0]} points x {k - 1} neighbours in {time.perf_counter() - t0:.2f} s')
+    return distances ** 2, indices
+
+
+def sparse_dmaps_basis(graph, epsilon, kappa=1, L=0.1, min_eigs=2):
+    from scipy import sparse
+    sq_distances, indices = graph
+    N, k = indices.shape
+    rows = np.repeat(np.arange(N), k)
+    K = sparse.csr_matrix((np.exp(-sq_distances.ravel() / (4 * epsilon)), (rows, indices.ravel())), shape=(N, N))
+    K = K.maximum(K.T)
+    # symmetric conjugate D^-1/2 K D^-1/2 of the Markov matrix D^-1 K: same eigenvalues, and its 
+    # eigenvectors times D^-1/2 are the right eigenvectors of the Markov matrix
+    d = 1 / np.sqrt(np.asarray(K.sum(axis=1)).ravel())
+    S = sparse.diags(d) @ K @ sparse.diags(d)
+    eigvals, eigvecs = leading_eigenpairs(S, N, L, min_eigs)
+    eigvecs = eigvecs * d[:, None]
+    basis = eigvecs * eigvals ** kappa
+    return basis, eigvals, eigvecs
+
+
+def kernel_tile(H, sq_norms, rows, cols, epsilon):
+    # Gaussian kernel exp(-|a - b|^2 / (4 epsilon)) between the row slices rows and cols of H
+    tile = H[rows] @ H[cols].T
+    tile *= -2
+    tile += sq_norms[rows, None]
+    tile += sq_norms[None, cols]
+    np.maximum(tile, 0, out=tile) # rounding takes the distance of close points below zero
+    tile *= -1 / (4 * epsilon)
+    np.exp(tile, out=tile)
+    return tile
+
+
+def blocked_dmaps_basis(H, epsilon, kappa=1, settings=None):
+    from concurrent.futures import ThreadPoolExecutor
+    from scipy.sparse.linalg import LinearOperator
+    t0 = time.perf_counter()
+    dtype = settings['dtype']
+    itemsize = np.dtype(dtype).itemsize
+    H = np.ascontiguousarray(H, dtype=dtype)
+    sq_norms = np.einsum('ij,ij->i', H, H)
+    N = H.shape[0]
+    budget = settings['budget']
+    kernel_bytes = N * N * itemsize
+    K = None
+    if kernel_bytes <= budget // 2:
+        storage = 'in memory'
+        K = np.empty((N, N), dtype=dtype)
+        budget -= kernel_bytes
+    elif settings['scratch'] is not None and shutil.disk_usage(os.path.dirname(settings['scratch'])).free > kernel_bytes:
+        storage = f"in {settings['scratch']}"
+        K = np.memmap(settings['scratch'], dtype=dtype, mode='w+', shape=(N, N))
+    else:
+        storage = 'recomputed for every product'
+    side = int(math.sqrt(budget / (DMAPS_BLOCK_TILES * settings['threads'] * itemsize)))
+    side = max(1, min(N, side))
+    blocks = [slice(i, min(i + side, N)) for i in range(0, N, side)]
+    
+    def kernel_rows(rows):
+        # row sums of a block of rows of the kernel, kept if there is room
+        sums = np.zeros(rows.stop - rows.start)
+        for cols in blocks:
+            tile = kernel_tile(H, sq_norms, rows, cols, epsilon)
+            sums += tile.sum(axis=1)
+            if K is not None:
+                K[rows, cols] = tile
+        return sums
+    
+    try:
+        with ThreadPoolExecutor(max_workers=settings['threads']) as pool:
+            d = 1 / np.sqrt(np.concatenate(list(pool.map(kernel_rows, blocks))))
+            print(f'DMAPS kernel: {N} x {N} in {side} x {side} tiles, {storage}, built in '
+                  f'{time.perf_counter() - t0:.2f} s')
+            
+            def product(X):
+                # D^-1/2 K D^-1/2 X, a block of rows at a time; the solver's products are cancellation points
+                check_cancelled()
+                X = np.asarray(X).reshape(N, -1)
+                Z = (X * d[:, None]).astype(dtype)
+                Y = np.empty((N, Z.shape[1]))
+                
+                def product_rows(rows):
+                    acc = np.zeros((rows.stop - rows.start, Z.shape[1]))
+                    for cols in blocks:
+                        tile = K[rows, cols] if K is not None else kernel_tile(H, sq_norms, rows, cols, epsilon)
+                        acc += tile @ Z[cols]
+                    Y[rows] = acc * d[rows, None]
+                
+                list(pool.map(product_rows, blocks))
+                return Y
+            
+            S = LinearOperator((N, N), matvec=product, matmat=product, dtype=np.float64)
+            eigvals, eigvecs = leading_eigenpairs(S, N, settings['L'], settings['min_eigs'])
+    finally:
+        if isinstance(K, np.memmap):
+            del K
+            os.remove(settings['scratch'])
+    print(f'DMAPS: {len(eigvals)} eigenpairs in {time.perf_counter() - t0:.2f} s')
+    eigvecs = eigvecs * d[:, None]
+    basis = eigvecs * eigvals ** kappa
+    return basis, eigvals, eigvecs
+
+
+def dmaps_kernel_hook(function):
+    def wrapper(H, epsilon, *args, **kwargs):
+        settings = getattr(_stage_context, 'dmaps', None)
+        if settings is None:
+            return function(H, epsilon, *args, **kwargs)
+        kappa = args[0] if args else kwargs.get('kappa', 1)
+        if settings['kernel'] == "Dense (blocked)":
+            return blocked_dmaps_basis(np.asarray(H), float(epsilon), float(kappa), settings)
+        graph = settings['graph']
+        if graph is None or graph[0] is not H:
+            # the kNN graph does not depend on epsilon: built once for the epsilon search
+            settings['graph'] = graph = (H, knn_graph(np.asarray(H), settings['neighbors']))
+        return sparse_dmaps_basis(graph[1], float(epsilon), float(kappa), settings['L'], settings['min_eigs'])
+    wrapper.plom_dmaps = True
+    return wrapper
+
+
+#################################   SAMPLE SINK   #################################
+
+# The finished augmented samples of a job can be kept in a file instead of in its results dictionary. 
+# Once PLoM's run has returned, the augmented array is written block by block to output/samples.npy 
+# (and samples.txt for the text format) at the job's precision, and replaced in the dictionary by a 
+# reference to that file, so that result.dict and the precision cast do not copy the samples. 
+# load_result_dict maps them back read-only. Sampling itself still holds all samples in memory.
+SAMPLE_SINK_ROWS = 65_536 # rows converted and written at a time
+SAMPLE_REFERENCE = 'samples_file' # key of the entry replacing the augmented array
+NPY_HEADER_BYTES = 128 # .npy header reserved by the sink, rewritten with the final shape
+
+
+def npy_header(shape, dtype):
+    # version 1.0 .npy header of a C-ordered array, padded to NPY_HEADER_BYTES
+    header = repr({'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)), 'fortran_order': False, 'shape': tuple(shape)})
+    header = header.ljust(NPY_HEADER_BYTES - 11) + '\n'
+    return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+
+class SampleSink:
+    # appendable .npy file: rows are copied (and cast) into a buffer of buffer_rows, appended to the file 
+    # when it is full, and the final row count is written into the header on close
+    def __init__(self, path, n_columns, dtype=np.float64, text_path=None, buffer_rows=SAMPLE_SINK_ROWS):
+        self.path = path
+        self.text_path = text_path
+        self.dtype = np.dtype(dtype)
+        self.n_columns = n_columns
+        self.rows = 0
+        self.buffer = np.empty((buffer_rows, n_columns), dtype=self.dtype)
+        self.buffered = 0
+        self.file = open(f'{path}.tmp', 'wb')
+        self.file.write(npy_header((0, n_columns), self.dtype))
+        self.text = open(f'{text_path}.tmp', 'w') if text_path else None
+    
+    def append(self, rows):
+        rows = np.asarray(rows).reshape(-1, self.n_columns)
+        while len(rows):
+            take = min(len(rows), len(self.buffer) - self.buffered)
+            self.buffer[self.buffered:self.buffered + take] = rows[:take]
+            self.buffered += take
+            rows = rows[take:]
+            if self.buffered == len(self.buffer):
+                self.flush()
+    
+    def flush(self):
+        block = self.buffer[:self.buffered]
+        self.file.write(block.data)
+        if self.text is not None:
+            np.savetxt(self.text, block, fmt=text_fmt(block))
+        self.rows += self.buffered
+        self.buffered = 0
+    
+    def close(self):
+        # reference to the samples file, relative to the job's output directory
+        self.flush()
+        self.file.seek(0)
+        self.file.write(npy_header((self.rows, self.n_columns), self.dtype))
+        self.file.close()
+        os.replace(f'{self.path}.tmp', self.path)
+        if self.text is not None:
+            self.text.close()
+            os.replace(f'{self.text_path}.tmp', self.text_path)
+        return {SAMPLE_REFERENCE: os.path.basename(self.path), 'shape': [self.rows, self.n_columns], 'dtype': self.dtype.name}
+    
+    def discard(self):
+        for f, path in [(self.file, self.path), (self.text, self.text_path)]:
+            if f is not None:
+                f.close()
+                os.remove(f'{path}.tmp')
+
+
+def open_sample_sink(plom_gui_input, output_path):
+    # sample sink settings of a job, None if its samples stay in the results dictionary
+    inputs = plom_gui_input
+    if inputs['sampling_yesNo'].strip() != "Yes" or inputs.get('sampling_toFile', 'No').strip() != "Yes":
+        return None
+    text = inputs['sampling_saveSamples'].strip() == "Yes" and inputs['sampling_samplesFType'].strip() == 'txt'
+    return {'path': f'{output_path}/samples.npy', 'text_path': f'{output_path}/samples.txt' if text else None, 
+            'dtype': precision_dtype(inputs)}
+
+
+def samples_to_file(solution_dict, settings):
+    # move the augmented samples of a solution dictionary to the sink's file, leaving a reference
+    data = solution_dict.get('data', {})
+    augmented = data.get('augmented')
+    if not isinstance(augmented, np.ndarray) or augmented.ndim != 2:
+        return
+    t0 = time.perf_counter()
+    sink = SampleSink(settings['path'], augmented.shape[1], settings['dtype'], settings['text_path'])
+    try:
+        for start in range(0, augmented.shape[0], SAMPLE_SINK_ROWS):
+            sink.append(augmented[start:start + SAMPLE_SINK_ROWS])
+    except BaseException:
+        sink.discard()
+        raise
+    data['augmented'] = sink.close()
+    print(f'\nSamples written ({sink.dtype.name}, {sink.rows} rows) in {time.perf_counter() - t0:.2f} s: "{sink.path}"'
+          + (f' and "{sink.text_path}"' if sink.text_path else ''))
+
+
+def map_samples(solution_dict, output_path):
+    # replace a reference to a samples file by the samples, mapped read-only
+    augmented = nested_get(solution_dict, 'data', 'augmented')
+    if isinstance(augmented, dict) and SAMPLE_REFERENCE in augmented:
+        solution_dict['data']['augmented'] = np.load(os.path.join(output_path, augmented[SAMPLE_REFERENCE]), mmap_mode='r')
+    return solution_dict
+
+
+def load_result_dict(path):
+    # results dictionary of a job, with samples kept in a file mapped back from it
+    return map_samples(load_dict(path), os.path.dirname(os.path.abspath(path)))
+
+
+#################################   PROGRESS   #################################
+
+# Structured progress of a job: stage_start/stage_end events for load, scaling, pca, dmaps, projection 
+# and sampling, and samples events (done/total) during parallel sampling. Events are appended to 
+# output/progress.jsonl and passed to the job's progress callable (the GUI queue).
+
+class ProgressReporter:
+    def __init__(self, job_path_full, sink=None, total_samples=None, min_interval=0.5):
+        self.path = f'{job_path_full}/output/progress.jsonl'
+        self.sink = sink
+        self.total_samples = total_samples
+        self.min_interval = min_interval # samples events are throttled, stage events never
+        self.t0 = time.time()
+        self.stage_t0 = {}
+        self.last_samples = 0.0
+        open(self.path, 'w').close() # a rerun of the job starts a new record
+    
+    def emit(self, event, stage=None, **fields):
+        now = time.time()
+        record = {'time': round(now, 3), 'elapsed_s': round(now - self.t0, 3), 'event': event, 'stage': stage, **fields}
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        if self.sink is not None:
+            self.sink(record)
+    
+    def stage_start(self, stage):
+        self.stage_t0[stage] = time.time()
+        self.emit('stage_start', stage)
+    
+    def stage_end(self, stage, **fields):
+        duration = time.time() - self.stage_t0.get(stage, self.t0)
+        self.emit('stage_end', stage, duration_s=round(duration, 3), **fields)
+    
+    def samples(self, done, total):
+        now = time.time()
+        if done < total and now - self.last_samples < self.min_interval:
+            return
+        self.last_samples = now
+        self.emit('samples', 'sampling', done=done, total=total)
+
+
+def total_samples(plom_gui_input):
+    try:
+        return int(plom_gui_input['sampling_NSamples'])
+    except (KeyError, ValueError):
+        return None
+
+
+def job_stages(plom_gui_input):
+    # stages a job goes through, in order, for progress displays
+    stages = ['load']
+    for stage, key in [('scaling', 'scaling_yesNo'), ('pca', 'pca_yesNo'), ('dmaps', 'dmaps_yesNo'), 
+                       ('projection', 'projection_yesNo'), ('sampling', 'sampling_yesNo')]:
+        if plom_gui_input.get(key, 'No').strip() == "Yes":
+            stages.append(stage)
+    return stages
+
+
+def install_sample_counter():
+    # parallel sampling runs through joblib, which reports every finished batch to a 
+    # BatchCompletionCallBack: a subclass, installed once per process, turns them into samples events 
+    # of the job whose sampling stage dispatched them. Batches complete on joblib's own threads, so the 
+    # job's reporter is attached to its Parallel object when the first batch is dispatched. Serial 
+    # sampling only reports stage events.
+    try:
+        import joblib.parallel
+    except ImportError:
+        return
+    base = joblib.parallel.BatchCompletionCallBack
+    if getattr(base, 'plom_progress', False):
+        return
+    
+    class ProgressCallBack(base):
+        plom_progress = True
+        
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            parallel = getattr(self, 'parallel', None)
+            reporter = getattr(_stage_context, 'sampling', None)
+            if parallel is not None and reporter is not None and not hasattr(parallel, 'plom_samples'):
+                parallel.plom_samples = {'reporter': reporter, 'tasks': 0}
+        
+        def __call__(self, *args, **kwargs):
+            result = super().__call__(*args, **kwargs)
+            parallel = getattr(self, 'parallel', None)
+            state = getattr(parallel, 'plom_samples', None)
+            if state is None or not state['reporter'].total_samples:
+                return result
+            reporter = state['reporter']
+            state['tasks'] += getattr(self, 'batch_size', 1)
+            # once all tasks are dispatched their count is known and tasks are mapped onto samples; 
+            # until then PLoM is assumed to dispatch one task per sample
+            n_tasks = reporter.total_samples
+            if not getattr(parallel, '_iterating', True):
+                n_tasks = getattr(parallel, 'n_dispatched_tasks', n_tasks)
+            done = round(reporter.total_samples * state['tasks'] / max(n_tasks, state['tasks'], 1))
+            reporter.samples(done, reporter.total_samples)
+            return result
+    
+    joblib.parallel.BatchCompletionCallBack = ProgressCallBack
+
+
+#################################   PROFILING   #################################
+
+# Wall time, CPU time and peak RSS of every phase of a job, saved to output/profile.json with the 
+# hardware and thread settings it ran with. CPU time and RSS are those of the job's process: in a 
+# Thread job they include the GUI, and joblib sampling workers are separate processes.
+
+def reset_peak_rss():
+    # Linux (4.0+) resets the VmHWM high-water mark when "5" is written to clear_refs
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # process lifetime, not resettable
+    return peak / 1024**2 if sys.platform == 'darwin' else peak / 1024
+
+
+class JobProfiler:
+    def __init__(self):
+        self.phases = []
+        self.open = {} # phase name -> [wall start, cpu start, peak RSS so far]
+        self.data_shape = None
+        self.n_jobs = None # sampling workers chosen by "auto"
+        self.peak_scope = 'phase' if reset_peak_rss() else 'process'
+    
+    def fold_peak(self):
+        # the high-water mark is process-wide: fold it into every open phase before it is reset
+        peak = peak_rss_mb()
+        for record in self.open.values():
+            if peak is not None:
+                record[2] = max(record[2] or 0, peak)
+    
+    def start(self, name):
+        self.fold_peak()
+        reset_peak_rss()
+        self.open[name] = [time.perf_counter(), time.process_time(), None]
+    
+    def stop(self, name):
+        self.fold_peak()
+        wall, cpu, peak = self.open.pop(name)
+        self.phases.append({'phase': name, 'wall_s': round(time.perf_counter() - wall, 4), 
+                            'cpu_s': round(time.process_time() - cpu, 4), 
+                            'peak_rss_mb': round(peak, 1) if peak is not None else None})
+    
+    def save(self, job_path_full, plom_gui_input):
+        phases = sorted(self.phases, key=lambda phase: (PROFILE_ORDER.index(phase['phase'].split('/')[0]), 
+                                                        '/' in phase['phase']))
+        top = [phase for phase in phases if '/' not in phase['phase']]
+        peaks = [phase['peak_rss_mb'] for phase in top if phase['peak_rss_mb'] is not None]
+        profile = {
+            'job': plom_gui_input['job_name'],
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'data': {'samples': self.data_shape[0], 'features': self.data_shape[1]} if self.data_shape else None,
+            'options': {key: plom_gui_input.get(key) for key in PROFILE_OPTIONS},
+            'phases': phases,
+            'total': {'wall_s': round(sum(phase['wall_s'] for phase in top), 4), 
+                      'cpu_s': round(sum(phase['cpu_s'] for phase in top), 4), 
+                      'peak_rss_mb': max(peaks) if peaks else None},
+            'peak_rss_scope': self.peak_scope,
+            'hardware': hardware_info(),
+            'threads': thread_info(plom_gui_input, self.n_jobs),
+            }
+        with open(f'{job_path_full}/output/profile.json', 'w') as f:
+            json.dump(profile, f, indent=2)
+        print_profile(profile, f'{job_path_full}/output/profile.json')
+        try:
+            os.makedirs(PLOM_DIR, exist_ok=True)
+            with open(PROFILE_HISTORY, 'a') as f:
+                f.write(json.dumps(profile) + '\n')
+        except OSError:
+            pass
+        return profile
+
+
+# phases in job order; run/<stage> phases are the PLoM stages inside run
+PROFILE_ORDER = ['ingest', 'audit', 'training write', 'deck write', 'parse', 'initialize', 'run', 
+                 'samples to file', 'cast and save samples', 'save_dict', 'summary']
+# job options that drive the cost of a job, recorded with its profile
+PROFILE_OPTIONS = ['scaling_yesNo', 'pca_yesNo', 'dmaps_yesNo', 'dmaps_epsilon', 'dmaps_kernel', 'dmaps_neighbors', 
+                   'dmaps_blockMB', 'dmaps_blockPrecision', 'dmaps_blockScratch', 'projection_yesNo', 
+                   'sampling_yesNo', 'sampling_NSamples', 'sampling_itoSteps', 'sampling_parallel', 'sampling_njobs', 'job_precision']
+
+
+def print_profile(profile, path):
+    print(f'\n*** PROFILE ***  ({path})\n')
+    print(f"{'phase':<24}{'wall s':>10}{'cpu s':>10}{'peak RSS MB':>14}")
+    for phase in profile['phases'] + [dict(profile['total'], phase='total')]:
+        peak = phase['peak_rss_mb']
+        name = '  ' + phase['phase'].split('/')[1] if '/' in phase['phase'] else phase['phase']
+        print(f"{name:<24}{phase['wall_s']:>10.2f}{phase['cpu_s']:>10.2f}{peak if peak is not None else '-':>14}")
+    print()
+
+
+def cpu_model():
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def memory_total_gb():
+    try:
+        return round(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1e9, 2)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def hardware_info():
+    import plom
+    return {
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'cpu': cpu_model(),
+        'logical_cpus': os.cpu_count(),
+        'available_cpus': available_cores(),
+        'memory_gb': memory_total_gb(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plom': getattr(plom, '__version__', None),
+        }
+
+
+def thread_info(plom_gui_input, n_jobs=None):
+    info = {'env': {key: os.environ.get(key) for key in THREAD_ENV_VARS}, 
+            'sampling_parallel': plom_gui_input.get('sampling_parallel'), 
+            'sampling_njobs': plom_gui_input.get('sampling_njobs')}
+    if n_jobs is not None:
+        info['sampling_workers'] = n_jobs
+    try:
+        from threadpoolctl import threadpool_info
+        info['pools'] = [{key: pool.get(key) for key in ['internal_api', 'num_threads', 'version']} 
+                         for pool in threadpool_info()]
+    except ImportError:
+        pass
+    return info
+
+
+#################################   ESTIMATES   #################################
+
+# Peak memory and runtime of each stage predicted from the data shape and the job options, before the 
+# job runs. Memory follows the arrays each stage holds (float64, as PLoM computes); runtimes are work 
+# units (the leading term of each stage's cost) times seconds per unit, taken from the profiles of past 
+# jobs on this machine when there are some. Both are order-of-magnitude guides, not guarantees.
+ESTIMATE_STAGES = ['load', 'scaling', 'pca', 'dmaps', 'projection', 'sampling']
+ESTIMATE_PHASES = {'load': 'ingest'} # profile phase of each stage, run/<stage> otherwise
+DEFAULT_SECONDS_PER_UNIT = {'load': 1e-7, 'scaling': 1e-9, 'pca': 1e-9, 'dmaps': 1e-9, 'dmaps sparse': 1e-8, 'dmaps blocked': 1e-9, 
+                            'projection': 1e-9, 'sampling': 1e-9}
+ITO_STEPS_AUTO = 100 # PLoM derives the number of Ito steps from f0 and dr; a typical value
+PROCESS_BASE_BYTES = 200 * 1024**2 # interpreter, numpy, plom
+HISTORY_PROFILES = 50 # most recent profiles used for calibration
+MEMORY_GUARDS = ["Warn", "Refuse", "Off"]
+
+
+def estimate_data_shape(plom_gui_input):
+    # (samples, features) of the training data the job would load, from the file preview; the row 
+    # count of a large text file is extrapolated from its first lines. None if unknown.
+    inputs = plom_gui_input
+    path = inputs['data_path']
+    if not os.path.isfile(path):
+        return None
+    if path.split('.')[-1] in EXCEL_EXTENSIONS:
+        try:
+            row_start, row_end = [int(i) for i in inputs['data_rowRange'].split(":")]
+            col_start, col_end = [excel_column_index(c) for c in inputs['data_columnRange'].split(":")]
+        except ValueError:
+            return None
+        n_rows, n_cols = row_end - row_start + 1, col_end - col_start + 1
+        return (n_cols, n_rows) if inputs['data_columnsAre'].strip() == 'Samples' else (n_rows, n_cols)
+    try:
+        shape = sniff_data_file(path).get('shape')
+    except Exception:
+        return None
+    if shape is None or len(shape) != 2:
+        return None
+    plan = selection_plan(shape[0], shape[1], inputs['data_rowIgnore'], inputs['data_colIgnore'], 
+                          str(inputs['data_hasIndices']).strip() not in ['', '0', 'False', 'No'], inputs['data_columnsAre'])
+    n_rows, n_cols = int(plan['rows'].sum()), int(plan['cols'].sum())
+    return (n_cols, n_rows) if plan['transpose'] else (n_rows, n_cols)
+
+
+def estimate_samples(plom_gui_input):
+    # number of samples a job is estimated for: 1 while the field is not a valid integer (e.g. being typed)
+    try:
+        return max(1, int(plom_gui_input['sampling_NSamples']))
+    except (KeyError, ValueError):
+        return 1
+
+
+def stage_requirements(n_points, n_features, plom_gui_input):
+    # {stage: (bytes the stage keeps, bytes it needs while it runs, work units)} of the enabled stages
+    inputs = plom_gui_input
+    N, n = n_points, n_features
+    data = 8 * N * n
+    stages = {'load': (data, data, N * n)}
+    if inputs['scaling_yesNo'].strip() == "Yes":
+        stages['scaling'] = (data, data, N * n)
+    if inputs['pca_yesNo'].strip() == "Yes":
+        stages['pca'] = (data, data + 8 * n * n, N * n * n + n ** 3)
+    if inputs['dmaps_yesNo'].strip() == "Yes" and inputs.get('dmaps_kernel', 'Dense').strip() == "Sparse kNN":
+        # kNN distances and indices, the sparse kernel and its transpose, and the leading eigenvectors
+        k = int(inputs.get('dmaps_neighbors') or 32)
+        stages['dmaps'] = (data, 5 * 16 * N * k + 8 * N * 2 * DMAPS_SPARSE_EIGS, 
+                           N * k * (np.log2(max(N, 2)) + 10 * DMAPS_SPARSE_EIGS))
+    elif inputs['dmaps_yesNo'].strip() == "Yes" and inputs.get('dmaps_kernel', 'Dense').strip() == "Dense (blocked)":
+        # tiles and, if it fits, the kernel within the budget; the solver's Lanczos vectors. A kernel that 
+        # is not stored is recomputed for every product of the solver.
+        kernel, budget, stored = blocked_kernel_plan(N, inputs)
+        threads = available_cores()
+        products = 10 * DMAPS_SPARSE_EIGS
+        units = N * N * (n + products) if stored else N * N * (n + 1) * (1 + products)
+        stages['dmaps'] = (data, data + min(budget, (1 + DMAPS_BLOCK_TILES * threads) * kernel) + 8 * N * 2 * DMAPS_SPARSE_EIGS, 
+                           units / threads)
+    elif inputs['dmaps_yesNo'].strip() == "Yes":
+        # dense N x N distances and kernel, then their eigendecomposition
+        stages['dmaps'] = (data, 2 * 8 * N * N, N * N * (N + n))
+    if inputs['projection_yesNo'].strip() == "Yes":
+        stages['projection'] = (data, data, N * n * n)
+    if inputs['sampling_yesNo'].strip() == "Yes":
+        num_samples = estimate_samples(inputs)
+        try:
+            steps = int(inputs['sampling_itoSteps']) or ITO_STEPS_AUTO
+        except ValueError:
+            steps = ITO_STEPS_AUTO
+        samples = 8 * num_samples * N * n
+        # every worker holds the data and the kernel weights of the potential (serial sampling runs in the 
+        # job process itself); the samples are stacked into the augmented array at the end
+        workers, _ = allot_job_cores(inputs, available_cores())
+        if inputs['sampling_parallel'].strip() == "Yes":
+            running = workers * sampling_worker_bytes(N, n) + 2 * samples
+        else:
+            running = sampling_worker_bytes(N, n) - WORKER_BASE_BYTES + 2 * samples
+        # samples kept in a file are not in the results dictionary when it is saved
+        to_file = inputs.get('sampling_toFile', 'No').strip() == "Yes"
+        stages['sampling'] = (0 if to_file else samples, running, num_samples * steps * N * N * n / workers)
+    return stages
+
+
+def blocked_kernel_plan(n_points, plom_gui_input):
+    # (kernel bytes, memory budget, whether the kernel is stored) of the blocked dense DMAPS kernel
+    inputs = plom_gui_input
+    precision = (inputs.get('dmaps_blockPrecision') or SESSION_DEFAULTS['dmaps_blockPrecision']).strip()
+    kernel = n_points * n_points * np.dtype(PRECISION_DTYPES[precision]).itemsize
+    try:
+        budget = float(inputs['dmaps_blockMB']) * 1024**2
+    except (KeyError, ValueError):
+        budget = float(SESSION_DEFAULTS['dmaps_blockMB']) * 1024**2
+    stored = kernel <= budget / 2 or (inputs.get('dmaps_blockScratch') or 'No').strip() == "Yes"
+    return kernel, budget, stored
+
+
+def rate_key(stage, plom_gui_input):
+    # the DMAPS kernels have their own cost per work unit
+    kernel = plom_gui_input.get('dmaps_kernel', 'Dense').strip()
+    if stage == 'dmaps' and kernel == "Sparse kNN":
+        return 'dmaps sparse'
+    if stage == 'dmaps' and kernel == "Dense (blocked)":
+        return 'dmaps blocked'
+    return stage
+
+
+def stage_peaks(stages):
+    # peak memory of every stage: what the job process holds from the stages before it, plus what the 
+    # stage needs while it runs
+    peaks = {}
+    kept = PROCESS_BASE_BYTES
+    for stage, (keep, running, _) in stages.items():
+        peaks[stage] = kept + running
+        kept += keep
+    return peaks
+
+
+def profile_history(path=None, host=None):
+    # most recent profiles recorded on this machine
+    host = host or platform.node()
+    profiles = []
+    try:
+        with open(path or PROFILE_HISTORY) as f:
+            for line in f:
+                try:
+                    profile = json.loads(line)
+                except ValueError:
+                    continue
+                if (profile.get('hardware') or {}).get('host') == host and profile.get('data'):
+                    profiles.append(profile)
+    except OSError:
+        pass
+    return profiles[-HISTORY_PROFILES:]
+
+
+def calibrate(profiles):
+    # seconds per work unit of every stage (total time over total units of the profiles that ran it, so 
+    # that the largest jobs, least affected by fixed overheads, weigh most), and the ratio of the 
+    # measured to the predicted peak memory of jobs whose sampling ran in the job process
+    rates = {key: [] for key in DEFAULT_SECONDS_PER_UNIT}
+    memory = []
+    for profile in profiles:
+        options = {key: value or '' for key, value in profile['options'].items()}
+        options = {'scaling_yesNo': 'Yes', 'projection_yesNo': 'Yes', 'pca_yesNo': 'No', 'dmaps_yesNo': 'No', 
+                   'sampling_yesNo': 'No', 'sampling_NSamples': '1', 'sampling_itoSteps': '0', 
+                   'sampling_parallel': 'No', 'sampling_njobs': '1', **options}
+        workers = (profile.get('threads') or {}).get('sampling_workers')
+        if workers:
+            options['sampling_njobs'] = str(workers)
+        stages = stage_requirements(profile['data']['samples'], profile['data']['features'], options)
+        phases = {phase['phase']: phase for phase in profile['phases']}
+        for stage, (_, _, units) in stages.items():
+            phase = phases.get(ESTIMATE_PHASES.get(stage, f'run/{stage}'))
+            if phase is not None and units > 0 and phase['wall_s'] > 0:
+                rates[rate_key(stage, options)].append((phase['wall_s'], units))
+        peak = profile['total'].get('peak_rss_mb')
+        if peak and options['sampling_parallel'].strip() != "Yes":
+            memory.append(peak * 1024**2 / max(stage_peaks(stages).values()))
+    seconds_per_unit = {stage: sum(wall for wall, _ in values) / sum(units for _, units in values) if values 
+                        else DEFAULT_SECONDS_PER_UNIT[stage] for stage, values in rates.items()}
+    memory_factor = min(max(float(np.median(memory)), 1.0), 3.0) if memory else 1.0
+    return seconds_per_unit, memory_factor
+
+
+def estimate_job(plom_gui_input, shape=None, profiles=None):
+    # per-stage peak memory and runtime of a job; shape defaults to the preview of its data file
+    shape = shape or estimate_data_shape(plom_gui_input)
+    if shape is None:
+        return None
+    n_points, n_features = int(shape[0]), int(shape[1])
+    if profiles is None:
+        profiles = profile_history()
+    seconds_per_unit, memory_factor = calibrate(profiles)
+    requirements = stage_requirements(n_points, n_features, plom_gui_input)
+    peaks = stage_peaks(requirements)
+    stages = [{'stage': stage, 'peak_bytes': int(memory_factor * peaks[stage]), 
+               'seconds': units * seconds_per_unit[rate_key(stage, plom_gui_input)]} 
+              for stage, (_, _, units) in requirements.items()]
+    available, source = available_memory()
+    estimate = {
+        'shape': (n_points, n_features),
+        'stages': stages,
+        'peak_bytes': max(stage['peak_bytes'] for stage in stages),
+        'seconds': sum(stage['seconds'] for stage in stages),
+        'profiles': len(profiles),
+        'available_bytes': available,
+        'available_source': source,
+        'warnings': [],
+        }
+    budget = None if available is None else available * MEMORY_HEADROOM
+    estimate['over_budget'] = budget is not None and estimate['peak_bytes'] > budget
+    if budget is not None:
+        for stage in stages:
+            if stage['peak_bytes'] > budget:
+                estimate['warnings'].append(
+                    f"{stage['stage']}: ~{stage['peak_bytes'] / 1e9:.1f} GB needed, "
+                    f"{budget / 1e9:.1f} GB usable ({source})")
+    if 'dmaps' in [stage['stage'] for stage in stages] and rate_key('dmaps', plom_gui_input) == 'dmaps':
+        kernel = 8 * n_points * n_points
+        if budget is not None and 2 * kernel > budget:
+            estimate['warnings'].append(
+                f"DMAPS: the dense {n_points} x {n_points} kernel alone is {kernel / 1e9:.1f} GB; "
+                "use the Dense (blocked) or Sparse kNN kernel")
+    if 'dmaps' in [stage['stage'] for stage in stages] and rate_key('dmaps', plom_gui_input) == 'dmaps blocked':
+        kernel, _, stored = blocked_kernel_plan(n_points, plom_gui_input)
+        if not stored:
+            estimate['warnings'].append(
+                f"DMAPS: the {kernel / 1e9:.1f} GB kernel exceeds half the block memory and is recomputed for every "
+                "product of the eigen-solver; enable the scratch file or raise the block memory")
+    if 'sampling' in [stage['stage'] for stage in stages]:
+        num_samples = estimate_samples(plom_gui_input)
+        samples = 8 * num_samples * n_points * n_features
+        if budget is not None and samples > budget:
+            estimate['warnings'].append(
+                f"Sampling: {num_samples} x {n_points} augmented rows are {samples / 1e9:.1f} GB; "
+                "reduce the number of samples")
+    return estimate
+
+
+def format_bytes(n_bytes):
+    for unit, size in [('GB', 1e9), ('MB', 1e6)]:
+        if n_bytes >= size:
+            return f'{n_bytes / size:.1f} {unit}'
+    return f'{n_bytes / 1e3:.0f} kB'
+
+
+def format_duration(seconds):
+    for unit, size in [('d', 86400), ('h', 3600), ('min', 60)]:
+        if seconds >= size:
+            return f'{seconds / size:.1f} {unit}'
+    return f'{seconds:.1f} s'
+
+
+def format_estimate(estimate):
+    # text table of an estimate, as printed to the log and shown in the GUI
+    lines = [f"{'stage':<12}{'peak memory':>14}{'time':>12}"]
+    for stage in estimate['stages']:
+        lines.append(f"{stage['stage']:<12}{format_bytes(stage['peak_bytes']):>14}{format_duration(stage['seconds']):>12}")
+    lines.append(f"{'total':<12}{format_bytes(estimate['peak_bytes']):>14}{format_duration(estimate['seconds']):>12}")
+    basis = (f"{estimate['profiles']} past job profile(s)" if estimate['profiles'] 
+             else "default rates (no past jobs on this machine)")
+    lines.append(f"{estimate['shape'][0]} x {estimate['shape'][1]} data; runtimes from {basis}")
+    if estimate['available_bytes'] is not None:
+        lines.append(f"Available memory: {format_bytes(estimate['available_bytes'])} ({estimate['available_source']})")
+    return '\n'.join(lines)
+
+
+def check_job_estimate(plom_gui_input, shape):
+    # memory guard of a job about to run: "Warn" logs the estimate when it exceeds the available 
+    # memory, "Refuse" also stops the job. True if the job may go on.
+    guard = plom_gui_input.get('job_memoryGuard', 'Warn').strip()
+    if guard == "Off":
+        return True
+    estimate = estimate_job(plom_gui_input, shape)
+    if estimate is None or not estimate['over_budget']:
+        return True
+    print(f"Estimated peak memory exceeds the available memory:\n{format_estimate(estimate)}")
+    for line in estimate['warnings']:
+        print(f"    {line}")
+    if guard == "Refuse":
+        print("Memory guard: job refused")
+        return False
+    print()
+    return True
+
+
+#################################   SHARED TRAINING DATA   #################################
+
+# Concurrent jobs on the same dataset map one float64 copy of the training array instead of each 
+# holding its own. Segments are files in a directory owned by the GUI session (page cache, shared by 
+# every process that maps them); the queue counts the active jobs of each segment and removes it when 
+# the last one has finished.
+
+
+def pid_alive(pid):
+    if os.name == 'nt':
+        return True # not probed on Windows, directories of crashed sessions are left in place
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def shared_segment_dir(base_dir=SHARED_DATA_DIR):
+    # segment directory of this GUI session; directories left behind by sessions that are gone are removed
+    os.makedirs(base_dir, exist_ok=True)
+    for name in os.listdir(base_dir):
+        if name.isdigit() and int(name) != os.getpid() and not pid_alive(int(name)):
+            shutil.rmtree(os.path.join(base_dir, name), ignore_errors=True)
+    segment_dir = os.path.join(base_dir, str(os.getpid()))
+    os.makedirs(segment_dir, exist_ok=True)
+    return segment_dir
+
+
+def shared_training_path(plom_gui_input, segment_dir):
+    # segment a job would use, or None if its training data cannot be identified
+    try:
+        return os.path.join(segment_dir, f'{training_data_key(plom_gui_input)}.npy')
+    except (OSError, KeyError):
+        return None
+
+
+def publish_training_segment(source_path, segment_path):
+    # float64 .npy of the job's training file; a float64 .npy is linked rather than copied
+    data = load_training_file(source_path, mmap_mode='r')
+    if source_path.split('.')[-1] == 'npy' and data.dtype == np.float64 and data.flags.c_contiguous:
+        del data
+        link_file(source_path, segment_path, allow_symlink=False)
+        return
+    tmp = f'{segment_path}.{os.getpid()}.tmp.npy'
+    np.save(tmp, np.asarray(data, dtype=np.float64))
+    os.chmod(tmp, 0o444)
+    os.replace(tmp, segment_path) # atomic: attaching jobs never see a partial segment
+
+
+def attach_shared_training(segment_path, source_path):
+    # read-only attach: the segment file is opened read-only and mapped copy-on-write, so writes by 
+    # the job stay private to it. The first job to arrive publishes the segment, under a file lock so 
+    # that concurrent jobs wait for it instead of writing their own.
+    with open(f'{segment_path}.lock', 'a') as lock:
+        try:
+            import fcntl
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        except ImportError:
+            pass # no locking on Windows: a concurrent publisher only costs a duplicate write
+        if not os.path.isfile(segment_path):
+            publish_training_segment(source_path, segment_path)
+            print(f'Training data published to shared segment: "{segment_path}"')
+    return np.load(segment_path, mmap_mode='c')
+
+
+def release_training_segment(segment_path):
+    # jobs still mapping the segment keep their pages until they exit
+    for path in [segment_path, f'{segment_path}.lock']:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+#################################   JOB QUEUE   #################################
+
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 
+                   'NUMEXPR_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS']
+
+
+def affinity_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def read_first_line(path):
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota():
+    # CPUs granted by the cgroup CPU quota (containers, systemd slices), None when unlimited
+    line = read_first_line('/sys/fs/cgroup/cpu.max') # cgroup v2: "<quota> <period>" or "max <period>"
+    if line:
+        quota, period = (line.split() + ['100000'])[:2]
+    else:
+        quota = read_first_line('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') # cgroup v1, -1 when unlimited
+        period = read_first_line('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+    try:
+        quota, period = int(quota), int(period)
+    except (TypeError, ValueError):
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return quota / period
+
+
+def available_cores():
+    # CPUs this process may use: its affinity mask, capped by the cgroup quota
+    cores = affinity_cores()
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cores = min(cores, max(1, math.ceil(quota)))
+    return cores
+
+
+def cgroup_memory_headroom():
+    # bytes left under the cgroup memory limit, None when unlimited
+    for limit_path, usage_path in [('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory.current'), 
+                                   ('/sys/fs/cgroup/memory/memory.limit_in_bytes', 
+                                    '/sys/fs/cgroup/memory/memory.usage_in_bytes')]:
+        limit, usage = read_first_line(limit_path), read_first_line(usage_path)
+        try:
+            limit, usage = int(limit), int(usage)
+        except (TypeError, ValueError):
+            continue
+        if limit >= 1 << 60: # cgroup v1 reports "unlimited" as a huge number
+            return None
+        return max(0, limit - usage)
+    return None
+
+
+def available_memory():
+    # (bytes, source) of the memory new workers can use: MemAvailable, or the cgroup headroom if smaller
+    available, source = None, None
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    available, source = int(line.split()[1]) * 1024, 'MemAvailable'
+                    break
+    except OSError:
+        pass
+    headroom = cgroup_memory_headroom()
+    if headroom is not None and (available is None or headroom < available):
+        available, source = headroom, 'cgroup limit'
+    return available, source
+
+
+# memory model of parallel sampling: each worker is a fresh interpreter holding a copy of the training 
+# data, the Ito integration state and the N x N kernel weights of the potential gradient; the samples 
+# all come back to the job process, where they are stacked into one array (held twice at the end)
+WORKER_BASE_BYTES = 150 * 1024**2
+MEMORY_HEADROOM = 0.8 # fraction of the available memory the workers may take
+
+
+def sampling_worker_bytes(n_points, n_features):
+    return WORKER_BASE_BYTES + 8 * (2 * n_points * n_points + 5 * n_points * n_features)
+
+
+def auto_n_jobs(n_points, n_features, num_samples, core_limit=None):
+    # sampling worker count for n_jobs "auto", and the reasons for it (logged when the job starts)
+    affinity = affinity_cores()
+    quota = cgroup_cpu_quota()
+    n_jobs = available_cores()
+    reasons = [f"CPUs: {n_jobs} (affinity {affinity}, cgroup quota "
+               f"{'none' if quota is None else f'{quota:g}'})"]
+    if core_limit is not None and core_limit < n_jobs:
+        n_jobs = max(1, core_limit)
+        reasons.append(f"Job queue allotment: {core_limit} core(s)")
+    n_jobs = min(n_jobs, max(1, num_samples))
+    available, source = available_memory()
+    if available is not None:
+        worker = sampling_worker_bytes(n_points, n_features)
+        samples = 2 * 8 * num_samples * n_points * n_features
+        fit = int((available * MEMORY_HEADROOM - samples) // worker)
+        reasons.append(f"Memory: {available / 1e9:.2f} GB available ({source}), ~{worker / 1e9:.2f} GB per worker "
+                       f"for {n_points} x {n_features} data, {samples / 1e9:.2f} GB for {num_samples} sample(s) "
+                       f"-> {max(fit, 0)} worker(s)")
+        if fit < 1:
+            reasons.append("Warning: the estimate exceeds the available memory, sampling with one worker")
+        n_jobs = max(1, min(n_jobs, fit))
+    else:
+        reasons.append("Memory: unknown on this platform, not limiting")
+    return n_jobs, reasons
+
+
+def allot_job_cores(plom_gui_input, core_budget):
+    # cores a job occupies and the job inputs to run it with: parallel sampling uses n_jobs workers 
+    # (negative values counted back from the budget, as joblib does; "auto" takes the CPUs available 
+    # to the process, the job itself may use fewer), serial jobs use one core
+    inputs = dict(plom_gui_input)
+    if inputs['sampling_yesNo'].strip() != "Yes" or inputs['sampling_parallel'].strip() != "Yes":
+        return 1, inputs
+    if inputs['sampling_njobs'].strip() == "auto":
+        return min(available_cores(), core_budget), inputs
+    try:
+        n_jobs = int(inputs['sampling_njobs'])
+    except ValueError:
+        n_jobs = -1
+    if n_jobs < 0:
+        n_jobs = core_budget + 1 + n_jobs
+    n_jobs = min(max(n_jobs, 1), core_budget)
+    inputs['sampling_njobs'] = str(n_jobs) # -1 would otherwise grab every core of the machine
+    return n_jobs, inputs
+
+
+def thread_env(n_threads):
+    # BLAS/OpenMP pool size for a job process, so that it stays within its cores
+    return {key: str(max(1, n_threads)) for key in THREAD_ENV_VARS}
+
+
+def jobs_to_start(jobs, max_jobs, core_budget):
+    # queued jobs that fit next to the running ones, in queue order; a later, smaller job may start 
+    # ahead of one that does not fit yet so that cores do not sit idle
+    running = [job for job in jobs if job['status'] == 'running']
+    n_running = len(running)
+    cores_used = sum(job['cores'] for job in running)
+    selected = []
+    for job in jobs:
+        if job['status'] != 'queued' or n_running >= max_jobs:
+            continue
+        # a job larger than the whole budget still runs, alone
+        if cores_used + job['cores'] <= core_budget or n_running == 0:
+            selected.append(job)
+            n_running += 1
+            cores_used += job['cores']
+    return selected
+
+
+
+#################################   PARAMETER SWEEPS   #################################
+
+# input deck option -> GUI input key
+SWEEP_FIELDS = {
+    'dmaps_epsilon': 'dmaps_epsilon',
+    'dmaps_kappa': 'dmaps_kappa',
+    'dmaps_L': 'dmaps_L',
+    'num_samples': 'sampling_NSamples',
+    'ito_f0': 'sampling_f0',
+    'ito_dr': 'sampling_dr',
+    'ito_kde_bw_factor': 'sampling_kdeBW',
+    }
+INTEGER_SWEEP_FIELDS = ['dmaps_kappa', 'num_samples']
+SWEEP_DESIGNS = ["Grid", "Random"]
+
+
+def parse_sweep_spec(spec):
+    # "0.5, 1, 2" -> listed values; "start:stop:num" -> evenly spaced range; "start:stop:num:log" -> geometric range
+    spec = spec.strip()
+    if spec == "":
+        return None
+    if ":" in spec:
+        parts = [part.strip() for part in spec.split(":")]
+        if len(parts) not in [3, 4] or (len(parts) == 4 and parts[3].lower() != 'log'):
+            raise ValueError(f'Invalid sweep range "{spec}", expected start:stop:num or start:stop:num:log')
+        if int(parts[2]) < 1:
+            raise ValueError(f'Invalid sweep range "{spec}", num must be at least 1')
+        spec = {'range': (float(parts[0]), float(parts[1])), 'num': int(parts[2]), 'log': len(parts) == 4}
+        if spec['log'] and min(spec['range']) <= 0:
+            raise ValueError('Geometric sweep ranges must be positive')
+        return spec
+    values = [value.strip() for value in spec.split(",") if value.strip()]
+    if not values:
+        raise ValueError(f'Invalid sweep values "{spec}"')
+    return {'values': values}
+
+
+def sweep_value(value, field):
+    return str(int(round(value))) if field in INTEGER_SWEEP_FIELDS else f'{value:.6g}'
+
+
+def expand_sweep(specs, design="Grid", n_points=10, seed=0):
+    # design points as [{deck option: value string}]: the full grid of all values, or n_points random 
+    # draws (ranges sampled uniformly, or log-uniformly for geometric ones)
+    fields = list(specs)
+    if design != "Grid" and n_points < 1:
+        raise ValueError('The number of random design points must be at least 1')
+    if design == "Grid":
+        axes = []
+        for field in fields:
+            spec = specs[field]
+            if 'values' in spec:
+                axes.append(spec['values'])
+            else:
+                space = np.geomspace if spec['log'] else np.linspace
+                axes.append([sweep_value(v, field) for v in space(*spec['range'], spec['num'])])
+        return [dict(zip(fields, combo)) for combo in itertools.product(*axes)]
+    rng = np.random.default_rng(seed)
+    points = []
+    for _ in range(n_points):
+        point = {}
+        for field in fields:
+            spec = specs[field]
+            if 'values' in spec:
+                point[field] = spec['values'][rng.integers(len(spec['values']))]
+            elif spec['log']:
+                point[field] = sweep_value(np.exp(rng.uniform(*np.log(spec['range']))), field)
+            else:
+                point[field] = sweep_value(rng.uniform(*spec['range']), field)
+        points.append(point)
+    return points
+
+
+def sweep_point_name(i):
+    return f'point_{i:03d}'
+
+
+def create_sweep(plom_gui_input, points):
+    # the sweep root <job path>/<job name> is created as a regular job, so the training data is loaded, 
+    # audited and written once; every design point gets its own directory with a link to that file 
+    # and an input deck. Returns the job inputs of the points.
+    if not points:
+        print('Sweep not created: the design has no points\n')
+        return None
+    if not create_job(plom_gui_input):
+        return None
+    root = f"{plom_gui_input['job_path']}/{plom_gui_input['job_name']}"
+    training_fname = training_fname_for(plom_gui_input)
+    point_inputs = []
+    for i, point in enumerate(points):
+        inputs = dict(plom_gui_input)
+        inputs['job_path'] = root
+        inputs['job_name'] = sweep_point_name(i)
+        for field, value in point.items():
+            inputs[SWEEP_FIELDS[field]] = value
+        job_path_full = f"{root}/{inputs['job_name']}"
+        os.makedirs(f'{job_path_full}/output', exist_ok=True)
+        link_file(f'{root}/{training_fname}', f'{job_path_full}/{training_fname}')
+        make_input_deck(inputs, training_fname)
+        write_session(f'{job_path_full}/session.txt', inputs)
+        point_inputs.append(inputs)
+    
+    with open(f'{root}/sweep_design.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['point'] + list(points[0]))
+        for i, point in enumerate(points):
+            writer.writerow([sweep_point_name(i)] + list(point.values()))
+    print(f'Sweep created: {len(points)} design points in "{root}"\n')
+    return point_inputs
+
+
+def nested_get(obj, *keys):
+    try:
+        for key in keys:
+            obj = obj[key]
+        return obj
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def result_metrics(solution_dict):
+    # key figures of a finished job for sweep tables
+    augmented = nested_get(solution_dict, 'data', 'augmented')
+    eigvals = nested_get(solution_dict, 'pca', 'eigvals')
+    return {
+        'pca_dim': len(eigvals) if eigvals is not None else None,
+        'dmaps_dim': nested_get(solution_dict, 'dmaps', 'dimension'),
+        'n_augmented': augmented.shape[0] if augmented is not None else None,
+        }
+
+
+def sweep_results(root, points, statuses):
+    # results table of a sweep (timings and key metrics per point), saved as sweep_results.csv
+    rows = []
+    for i, point in enumerate(points):
+        job_path_full = f'{root}/{sweep_point_name(i)}'
+        row = {'point': sweep_point_name(i), **point, 'status': statuses[i], 'wall_s': None}
+        try:
+            with open(f'{job_path_full}/output/timing.json') as f:
+                row['wall_s'] = round(json.load(f)['wall_s'], 2)
+        except (OSError, ValueError, KeyError):
+            pass
+        metrics = {'pca_dim': None, 'dmaps_dim': None, 'n_augmented': None}
+        if os.path.isfile(f'{job_path_full}/output/result.dict'):
+            try:
+                metrics = result_metrics(load_result_dict(f'{job_path_full}/output/result.dict'))
+            except Exception:
+                pass
+        row.update(metrics)
+        rows.append(row)
+    
+    with open(f'{root}/sweep_results.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    
+    columns = list(rows[0])
+    table = [[str(row[c]) if row[c] is not None else '-' for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[j]) for r in table)) for j, c in enumerate(columns)]
+    print('\n*** SWEEP RESULTS ***\n')
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in table:
+        print('  '.join(v.ljust(w) for v, w in zip(r, widths)))
+    print(f'\nSweep results saved: "{root}/sweep_results.csv"\n')
+    return rows
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,7 +11,8 @@ description = (
 dependencies = [
     "numpy",
     "matplotlib",
-    "scipy"
+    "scipy",
+    "pandas"
 ]
 
 setup(
@@ -22,11 +23,17 @@ setup(
     author="Philippe Hawi",
     author_email="philippe.hawi@outlook.com",
     license="MIT",
-    py_modules=['plom_gui'],
+    py_modules=['plom_gui', 'plom_pipeline'],
     install_requires=dependencies,
+    extras_require={
+        'parquet': ['pyarrow'],
+        'hdf5': ['h5py'],
+        'excel': ['openpyxl'],
+    },
     entry_points={
         'console_scripts': [
             'plom-gui=plom_gui:launch_gui',
+            'plom-batch=plom_pipeline:main',
         ],
     },
 )
\ No newline at end of file